@@ -1,13 +1,25 @@
 import argparse
-import json
+import atexit
+import collections
+import contextlib
+import errno
+import functools
+import gzip
+import hashlib
+import io
+import itertools
+import multiprocessing
 import os
-import subprocess
+import queue
 import sys
+import threading
 import shutil
-import glob
+import stat
 import time
 import logging
+import logging.handlers
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,123 +31,607 @@ SIMPLIFIED_DIR = os.path.join(THIS_DIR, 'simplified_objects')
 INCOMING_DIR = os.path.join(THIS_DIR, 'incoming_objects')
 REPORT_DIR = os.path.join(THIS_DIR, 'report_objects')
 BACKUP_DIR = os.path.join(THIS_DIR, 'backup_objects')
+# incoming path -> (mtime, size, sha256) of the last processed version, for --skip-unchanged
+CACHE_PATH = os.path.join(THIS_DIR, '.pipeline_cache.json')
+# Cleaned outputs keyed by incoming file version, so unchanged inputs skip the clean step
+CLEAN_CACHE_DIR = os.path.join(THIS_DIR, '.cache', 'simplified')
+CLEAN_CACHE_MAX = 1024
 
-DOWNLOADSCRIPT = os.path.join(SCRIPTS_DIR, 'download_campos.py')
-CLEANSCRIPT = os.path.join(SCRIPTS_DIR, 'clean_campos.py')
-DIFFSCRIPT = os.path.join(SCRIPTS_DIR, 'diff_campos.py')
-EXPORTSCRIPT = os.path.join(SCRIPTS_DIR, 'export_reports_csv.py')
+# Precomputed "<dir>/" prefixes for per-object file names (see _in_dir).
+_INCOMING_PREFIX = INCOMING_DIR + os.sep
+_SIMPLIFIED_PREFIX = SIMPLIFIED_DIR + os.sep
+_BASELINE_PREFIX = BASELINE_DIR + os.sep
+_REPORT_PREFIX = REPORT_DIR + os.sep
+# Working directory at startup; CLI paths are resolved against it (see _abspath).
+_CWD = os.getcwd()
 
-# Try to import download list (objects) from the download script so the pipeline
-# can process exactly the same set of objects the downloader would.
-try:
-    from download_campos import objects as DOWNLOAD_OBJECTS
-except Exception:
-    try:
-        from scripts.download_campos import objects as DOWNLOAD_OBJECTS
-    except Exception:
-        DOWNLOAD_OBJECTS = []
+
+# Download, clean, diff and export run in-process (one interpreter for the whole
+# pipeline) instead of spawning a new Python per object and stage.
+sys.path.insert(0, SCRIPTS_DIR)
+import clean_campos
+import diff_campos
+import download_campos
+import export_reports_csv
+import json_utils
+
+# Content of a freshly created empty baseline (a machine-only placeholder).
+_EMPTY_BASELINE = b'{"fields":[]}'
+
+# Download list (objects) from the download script so the pipeline can process
+# exactly the same set of objects the downloader would.
+DOWNLOAD_OBJECTS = download_campos.objects
+
+
+@functools.lru_cache(maxsize=16)
+def _load_map_cached(path, mtime_ns, size):
+    return json_utils.load(path)
 
 
-def is_simplified(path):
+def load_objects_map(path):
+    """Parse an objects map JSON, reusing the previous parse while the file is unchanged."""
+    st = os.stat(path)
+    return _load_map_cached(path, st.st_mtime_ns, st.st_size)
+
+
+def _iter_json_entries(dirpath, prefix='', suffix='.json'):
+    # Same matching as glob('<prefix>*<suffix>'): hidden files are skipped.
     try:
-        with open(path, 'r', encoding='utf-8') as fh:
-            data = json.load(fh)
-    except Exception:
-        return False
-    if not isinstance(data, dict):
-        return False
-    fields = data.get('fields')
-    if not isinstance(fields, list) or not fields:
-        return False
-    first = fields[0]
-    return isinstance(first, dict) and 'name' in first and 'label' in first and 'picklistValues' in first
+        it = os.scandir(dirpath)
+    except FileNotFoundError:
+        return
+    with it:
+        for e in it:
+            if e.name.startswith('.') or not e.name.startswith(prefix) or not e.name.endswith(suffix):
+                continue
+            if e.is_file():
+                yield e
+
+
+def list_json(dirpath, prefix='', suffix='.json'):
+    """Return the sorted paths of `<prefix>*<suffix>` files in `dirpath`."""
+    return sorted(e.path for e in _iter_json_entries(dirpath, prefix, suffix))
+
+
+def most_recent_json(dirpath, suffix='.json'):
+    """Return the most recently modified `*<suffix>` file in `dirpath`, or None.
+
+    A single scandir pass; DirEntry.stat() reuses the directory read where the OS allows.
+    """
+    best = None
+    best_mtime = None
+    for e in _iter_json_entries(dirpath, suffix=suffix):
+        mtime = e.stat().st_mtime
+        if best is None or mtime > best_mtime:
+            best, best_mtime = e.path, mtime
+    return best
+
 
+# Set by main() (and by _init_worker in pool workers): False with --no-clean-cache.
+_USE_CLEAN_CACHE = True
 
-def run_clean(input_path, output_path):
-    cmd = [sys.executable, CLEANSCRIPT, input_path, output_path]
-    proc = subprocess.run(cmd, capture_output=True, text=False)
-    # decode using utf-8 with replacement to avoid console encoding errors
-    out = proc.stdout.decode('utf-8', errors='replace') if proc.stdout is not None else ''
-    err = proc.stderr.decode('utf-8', errors='replace') if proc.stderr is not None else ''
-    if proc.returncode != 0:
+
+@functools.lru_cache(maxsize=1)
+def _clean_code_stamp():
+    # Cached outputs are only valid for the clean_campos.py that produced them.
+    return _sha256_file(clean_campos.__file__)
+
+
+def _clean_cache_path(input_path, stamp=None):
+    if stamp is None:
+        st = os.stat(input_path)
+        stamp = (st.st_mtime_ns, st.st_size)
+    key = f'{os.path.realpath(input_path)}:{stamp[0]}:{stamp[1]}:{_clean_code_stamp()}'
+    return os.path.join(CLEAN_CACHE_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+
+def _prune_clean_cache():
+    # Drop the least recently used entries once the cache grows past CLEAN_CACHE_MAX.
+    try:
+        with os.scandir(CLEAN_CACHE_DIR) as it:
+            entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith('.json')]
+    except OSError:
+        return
+    if len(entries) <= CLEAN_CACHE_MAX:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - CLEAN_CACHE_MAX]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _store_clean_cache(output_path, cached):
+    try:
+        os.makedirs(CLEAN_CACHE_DIR, exist_ok=True)
+        tmp = f'{cached}.{os.getpid()}.tmp'
+        shutil.copyfile(output_path, tmp)
+        os.replace(tmp, cached)
+    except OSError as e:
+        logging.warning('Failed to cache cleaned output %s: %s', output_path, e)
+        return
+    _prune_clean_cache()
+
+
+def run_clean(input_path, output_path, stamp=None):
+    cached = None
+    if _USE_CLEAN_CACHE:
+        try:
+            cached = _clean_cache_path(input_path, stamp)
+        except OSError:
+            cached = None
+    if cached and os.path.isfile(cached):
+        # a copy, not a hardlink: the output gets promoted to baseline and may be edited by hand
+        shutil.copyfile(cached, output_path)
+        os.utime(cached)
+        print('Incoming unchanged, reused cleaned output:', output_path)
+        return
+    try:
+        clean_campos.run(input_path, output_path)
+    except Exception as e:
         print('clean_campos.py failed:')
-        if out:
-            print(out)
-        if err:
-            print(err)
+        print(e)
         raise SystemExit(2)
-    if out:
-        print(out.strip())
+    if cached:
+        _store_clean_cache(output_path, cached)
 
 
 def run_diff(old_simplified, new_simplified, report_path=None):
-    cmd = [sys.executable, DIFFSCRIPT, old_simplified, new_simplified]
-    if report_path:
-        cmd.append(report_path)
-    proc = subprocess.run(cmd, capture_output=True, text=False)
-    out = proc.stdout.decode('utf-8', errors='replace') if proc.stdout is not None else ''
-    err = proc.stderr.decode('utf-8', errors='replace') if proc.stderr is not None else ''
-    if proc.returncode != 0:
+    try:
+        diff_campos.run(old_simplified, new_simplified, report_path)
+    except Exception as e:
         print('diff_campos.py failed:')
-        if out:
-            print(out)
-        if err:
-            print(err)
+        print(e)
         raise SystemExit(3)
-    if out:
-        print(out)
     if report_path:
         print(f'Report written to {report_path}')
 
 
-def run_export(reports_dir, simplified_dir, baseline_dir, out_csv=None, out_modified=None):
-    """Run the CSV exporter to aggregate report-*.json into CSVs."""
-    cmd = [sys.executable, EXPORTSCRIPT, '--reports-dir', reports_dir, '--simplified-dir', simplified_dir, '--baseline-dir', baseline_dir]
-    if out_csv:
-        cmd += ['--out', out_csv]
-    if out_modified:
-        cmd += ['--out-modified', out_modified]
-    proc = subprocess.run(cmd, capture_output=True, text=False)
-    out = proc.stdout.decode('utf-8', errors='replace') if proc.stdout is not None else ''
-    err = proc.stderr.decode('utf-8', errors='replace') if proc.stderr is not None else ''
-    if proc.returncode != 0:
+def run_export(reports_dir, simplified_dir, baseline_dir, out_csv, out_modified, workers=1, exclude=()):
+    """Aggregate report-*.json (except those in `exclude`) into the summary/modified CSVs."""
+    try:
+        export_reports_csv.run(reports_dir, simplified_dir, baseline_dir, out_csv, out_modified, workers=workers,
+                               exclude=exclude)
+    except Exception as e:
         print('export_reports_csv.py failed:')
-        if out:
-            print(out)
-        if err:
-            print(err)
+        print(e)
         raise SystemExit(4)
-    if out:
-        print(out.strip())
-
-def run_download(target_org=None, only=None, parallel=None, timeout=None, retries=None, dry_run=False):
-    # Build download command and forward selected options to download_campos.py
-    cmd = [sys.executable, DOWNLOADSCRIPT]
-    if target_org:
-        cmd += ['--target-org', target_org]
-    if only:
-        cmd += ['--only', only]
-    if parallel is not None:
-        cmd += ['--parallel', str(parallel)]
-    if timeout is not None:
-        cmd += ['--timeout', str(timeout)]
-    if retries is not None:
-        cmd += ['--retries', str(retries)]
-    if dry_run:
-        cmd += ['--dry-run']
-
-    proc = subprocess.run(cmd, capture_output=True, text=False)
-    out = proc.stdout.decode('utf-8', errors='replace') if proc.stdout is not None else ''
-    err = proc.stderr.decode('utf-8', errors='replace') if proc.stderr is not None else ''
-    if proc.returncode != 0:
-        print('download_campos.py failed:')
-        if out:
-            print(out)
-        if err:
-            print(err)
-        raise SystemExit(3)
-    if out:
-        print(out.strip())
+
+
+def start_download(target_org=None, only=None, parallel=None, timeout=120, retries=2, dry_run=False, cache_ttl=0,
+                   use_rest=False, force_refresh=False):
+    """Start the describes on a background thread and return (wait, thread).
+
+    `wait(path)` blocks until the describe writing `path` has finished (it returns
+    at once for files that are not being downloaded), so each object is cleaned
+    and diffed as soon as its own describe lands instead of after all of them.
+    """
+    objs = download_campos.resolve_objects(os.path.join(THIS_DIR, 'objects_map.json'))
+    rest = download_campos.rest_auth(target_org, timeout=timeout) if use_rest and not dry_run else None
+    jobs = download_campos.build_jobs(objs, INCOMING_DIR, only=only, target_org=target_org,
+                                      dry_run=dry_run, timeout=timeout, retries=retries, cache_ttl=cache_ttl,
+                                      rest=rest, force_refresh=force_refresh)
+    done = {os.path.normpath(download_campos.incoming_path(job[0], job[1])): threading.Event() for job in jobs}
+    failed = []
+
+    def download():
+        try:
+            for label, rc, path in download_campos.iter_describe(jobs, parallel):
+                status = 'OK' if rc == 0 else f'ERR({rc})'
+                _write_output(f'{label}: {status}\n')
+                done[os.path.normpath(path)].set()
+        except Exception as e:
+            logging.error('Download failed: %s', traceback.format_exc())
+            _write_output(f'download_campos.py failed: {e}\n')
+            failed.append(e)
+        finally:
+            for event in done.values():
+                event.set()
+
+    thread = threading.Thread(target=download, name='download', daemon=True)
+    thread.start()
+
+    def wait(path):
+        event = done.get(os.path.normpath(path))
+        if event is not None:
+            event.wait()
+            if failed:
+                raise SystemExit(3)
+
+    return wait, thread
+
+
+def _abspath(path):
+    # os.path.abspath without the getcwd() call on every use.
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(_CWD, path))
+
+
+def _in_dir(name, prefix):
+    # Map entries may hold absolute paths; plain names are placed under the folder prefix.
+    return name if os.path.isabs(name) else prefix + name
+
+
+def _write_output(text):
+    if not text:
+        return
+    try:
+        sys.stdout.write(text)
+    except UnicodeEncodeError:
+        sys.stdout.buffer.write(text.encode('utf-8', errors='replace'))
+    sys.stdout.flush()
+
+
+# incoming_stamp is (mtime_ns, size) of the incoming file, taken once by iter_plans.
+ObjectPlan = collections.namedtuple('ObjectPlan', ['object', 'incoming', 'simplified', 'baseline', 'temp', 'report', 'incoming_stamp'],
+                                    defaults=(None,))
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def build_plan(entry, report_override=None):
+    """Resolve every path for one map entry up front (plans are cheap to send to workers)."""
+    incoming_path = _in_dir(entry.get('incoming'), _INCOMING_PREFIX)
+    obj_name = entry.get('object') or os.path.splitext(os.path.basename(incoming_path))[0].split('incoming-', 1)[-1]
+    simplified_name = entry.get('simplified') or f'simplified-{obj_name}.json'
+    baseline_name = entry.get('baseline') or f'baseline-{obj_name}.json'
+    report_name = entry.get('report') or f'report-{obj_name}.json'
+    return ObjectPlan(
+        object=obj_name,
+        incoming=incoming_path,
+        simplified=_in_dir(simplified_name, _SIMPLIFIED_PREFIX),
+        baseline=_in_dir(baseline_name, _BASELINE_PREFIX),
+        temp=f'{_SIMPLIFIED_PREFIX}simplified-{obj_name}.tmp.json',
+        report=report_override if report_override else _in_dir(report_name, _REPORT_PREFIX),
+    )
+
+
+def iter_entries(map_objects, incoming_list, only=None):
+    """Yield map-style entries for the objects to process, one at a time."""
+    if map_objects is not None:
+        yield from map_objects
+    elif DOWNLOAD_OBJECTS:
+        # If we have a DOWNLOAD_OBJECTS list from the downloader, prefer using it
+        # so the pipeline processes the same objects the downloader would.
+        # If --only was passed, filter the download list accordingly
+        tokens = None
+        if only:
+            tokens = frozenset(t.strip() for t in only.split(',') if t.strip())
+        for o in DOWNLOAD_OBJECTS:
+            label = o.get('label') or o.get('apiName')
+            api = o.get('apiName') or label
+            safe = label.replace(' ', '_')
+            # filter by tokens if requested
+            if tokens:
+                if tokens.isdisjoint((label, safe, api)):
+                    continue
+            incoming_basename = f'incoming-{safe}.json'
+            yield {'object': safe, 'incoming': incoming_basename, 'simplified': f'simplified-{safe}.json', 'baseline': f'baseline-{safe}.json', 'report': f'report-{safe}.json'}
+    else:
+        for incoming_path in incoming_list:
+            incoming_basename = os.path.basename(incoming_path)
+            obj_basename = os.path.splitext(incoming_basename)[0]
+            obj_name = obj_basename.split('incoming-', 1)[1] if obj_basename.startswith('incoming-') else obj_basename
+            yield {'object': obj_name, 'incoming': incoming_basename, 'simplified': f'simplified-{obj_name}.json', 'baseline': f'baseline-{obj_name}.json', 'report': f'report-{obj_name}.json'}
+
+
+def iter_plans(entries, report_override=None, cache=None, skip_unchanged=False, wait=None, skipped=None):
+    """Yield an ObjectPlan per entry whose incoming file exists (and changed, with `skip_unchanged`).
+
+    `wait` (see start_download) is called with each incoming path before it is checked.
+    The report paths of objects skipped as unchanged are appended to `skipped`.
+    """
+    for entry in entries:
+        if not entry.get('incoming'):
+            continue
+        plan = build_plan(entry, report_override)
+        if wait is not None:
+            wait(plan.incoming)
+        st = _stat(plan.incoming)
+        if st is None or not stat.S_ISREG(st.st_mode):
+            logging.warning('Incoming file not found, skipping: %s', plan.incoming)
+            print('Incoming file not found, skipping:', plan.incoming)
+            continue
+        # every later check on the incoming file reuses this stat
+        plan = plan._replace(incoming_stamp=(st.st_mtime_ns, st.st_size))
+        if skip_unchanged and is_unchanged(plan, cache):
+            print('Incoming unchanged since last run, skipping:', plan.object)
+            if skipped is not None:
+                skipped.append(plan.report)
+            continue
+        yield plan
+
+
+def _process_object(plan):
+    obj_name = plan.object
+    incoming_path = plan.incoming
+    logging.info('Starting processing object: %s (incoming: %s)', obj_name, incoming_path)
+    print('\n=== Processing object:', obj_name, '===')
+
+    if os.path.isfile(plan.baseline):
+        baseline_file_obj = plan.baseline
+        print('Using baseline file:', baseline_file_obj)
+    else:
+        matched = most_recent_json(BASELINE_DIR, suffix=f'{obj_name}.json')
+        if matched:
+            baseline_file_obj = matched
+            print('Using baseline file (matched):', baseline_file_obj)
+        else:
+            baseline_file_obj = os.path.join(BASELINE_DIR, f'empty_baseline_{obj_name}.json')
+            with open(baseline_file_obj, 'wb') as fh:
+                fh.write(_EMPTY_BASELINE)
+            print('No baseline found for', obj_name, '- created empty baseline at:', baseline_file_obj)
+
+    print('Cleaning', incoming_path, '->', plan.temp)
+    logging.info('Cleaning %s -> %s', incoming_path, plan.temp)
+    run_clean(incoming_path, plan.temp, plan.incoming_stamp)
+
+    print('Comparing baseline -> new simplified for', obj_name)
+    logging.info('Comparing baseline %s -> new simplified %s', baseline_file_obj, plan.temp)
+    run_diff(baseline_file_obj, plan.temp, plan.report)
+
+    return plan
+
+
+def _init_worker(queue, use_clean_cache):
+    # Spawned workers do not inherit main()'s globals, so they are passed in.
+    global _USE_CLEAN_CACHE
+    _USE_CLEAN_CACHE = use_clean_cache
+    # Workers hand their log records to the parent, which owns pipeline_run.log;
+    # under spawn they would otherwise have no handler at all.
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(queue))
+    root.setLevel(logging.INFO)
+
+
+class _ThreadStdout:
+    """sys.stdout stand-in that captures output per thread.
+
+    Writes from a thread inside capture() go to that thread's buffer; all other
+    threads (e.g. the background download and its describe workers) keep writing
+    to the real stream. contextlib.redirect_stdout would swap sys.stdout for
+    the whole process and pull their output into the object being processed.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        buf = getattr(self._local, 'buf', None)
+        return self._stream if buf is None else buf
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+    @classmethod
+    @contextlib.contextmanager
+    def capture(cls):
+        out = sys.stdout
+        if not isinstance(out, cls):
+            out = sys.stdout = cls(out)
+        buf = io.StringIO()
+        prev = getattr(out._local, 'buf', None)
+        out._local.buf = buf
+        try:
+            yield buf
+        finally:
+            out._local.buf = prev
+
+
+def process_object(plan):
+    """Clean and diff one object plan (may run in a worker process).
+
+    Output is captured and returned with the result so the main process can print
+    it in map order. A failing stage is reported through `exit_code` instead of
+    escaping as SystemExit.
+    """
+    result = {'output': '', 'exit_code': None, 'plan': None}
+    with _ThreadStdout.capture() as buf:
+        try:
+            result['plan'] = _process_object(plan)
+        except SystemExit as e:
+            result['exit_code'] = e.code
+    result['output'] = buf.getvalue()
+    return result
+
+
+# Set by main(): True when baseline, simplified and backup folders share one device.
+_SAME_FS = True
+
+# Set by main(): True with --compress, backups are then written gzipped.
+_COMPRESS_BACKUPS = False
+
+# Backup names: one timestamp per run plus a sequence number, so objects promoted
+# within the same second never overwrite each other's backup.
+_RUN_STAMP = time.strftime('%Y%m%dT%H%M%S')
+_BACKUP_SEQ = itertools.count()
+
+
+def _backup_path(obj_name, suffix='.json'):
+    while True:
+        bak = os.path.join(BACKUP_DIR, f'backup_{_RUN_STAMP}_{next(_BACKUP_SEQ):04d}_baseline-{obj_name}{suffix}')
+        # another run started in the same second may already own this name
+        if not os.path.exists(bak):
+            return bak
+
+
+def _same_filesystem(*dirs):
+    return len({os.stat(d).st_dev for d in dirs}) == 1
+
+
+def _move(src, dst):
+    # Same device: a single atomic rename. Otherwise (or for absolute map paths on
+    # another mount) fall back to shutil.move's copy+unlink.
+    if not _SAME_FS:
+        shutil.move(src, dst)
+        return
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+
+def _gzip_move(src, dst):
+    # level 1: backups are rarely read again, so favour speed over ratio
+    with open(src, 'rb') as fin:
+        try:
+            with gzip.open(dst, 'wb', compresslevel=1) as fout:
+                shutil.copyfileobj(fin, fout, 1 << 20)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(dst)
+            raise
+    os.remove(src)
+
+
+def promote_object(plan):
+    """Back up the current baseline, promote the previous simplified and install the new one."""
+    obj_name = plan.object
+    temp_simpl_obj = plan.temp
+    simplified_main_obj = plan.simplified
+    baseline_main_obj = plan.baseline
+    try:
+        if os.path.isfile(temp_simpl_obj):
+            bak = _backup_path(obj_name, '.json.gz' if _COMPRESS_BACKUPS else '.json')
+            try:
+                if _COMPRESS_BACKUPS:
+                    _gzip_move(baseline_main_obj, bak)
+                else:
+                    _move(baseline_main_obj, bak)
+                print('Backed up existing baseline to', bak)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print('Failed to backup existing baseline:', e)
+            try:
+                _move(simplified_main_obj, baseline_main_obj)
+                print('Promoted previous simplified -> baseline for', obj_name)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print('Failed to promote previous simplified to baseline:', e)
+            _move(temp_simpl_obj, simplified_main_obj)
+            print('Updated simplified file for', obj_name, ':', simplified_main_obj)
+    except Exception as e:
+        logging.warning('Failed to finalize promotion for %s: %s', obj_name, e)
+        print('Warning: failed to finalize promotion of simplified/baseline files for', obj_name, e)
+
+
+def _sha256_file(path):
+    with open(path, 'rb') as fh:
+        if hasattr(hashlib, 'file_digest'):
+            # Python 3.11+: hashes straight from the file buffer
+            return hashlib.file_digest(fh, 'sha256').hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def load_run_cache():
+    try:
+        data = json_utils.load(CACHE_PATH)
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_run_cache(cache):
+    tmp = CACHE_PATH + '.tmp'
+    json_utils.dump(cache, tmp, compact=True)
+    os.replace(tmp, CACHE_PATH)
+
+
+def record_processed(plan, cache):
+    mtime_ns, size = plan.incoming_stamp or _stamp(plan.incoming)
+    entry = cache.get(plan.incoming)
+    if entry and entry.get('sha256') and entry.get('mtime_ns') == mtime_ns and entry.get('size') == size:
+        # same version as last run: its hash is already known, don't read the file again
+        sha256 = entry['sha256']
+    else:
+        sha256 = _sha256_file(plan.incoming)
+    cache[plan.incoming] = {'mtime_ns': mtime_ns, 'size': size, 'sha256': sha256}
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def is_unchanged(plan, cache):
+    """True when `plan.incoming` matches the last processed version and its outputs exist."""
+    entry = cache.get(plan.incoming)
+    if not entry or not (os.path.isfile(plan.simplified) and os.path.isfile(plan.report)):
+        return False
+    if plan.incoming_stamp is not None:
+        mtime_ns, size = plan.incoming_stamp
+    else:
+        try:
+            mtime_ns, size = _stamp(plan.incoming)
+        except OSError:
+            return False
+    if size != entry.get('size'):
+        return False
+    if mtime_ns == entry.get('mtime_ns'):
+        return True
+    # re-downloaded files get a new mtime; fall back to comparing content
+    if _sha256_file(plan.incoming) != entry.get('sha256'):
+        return False
+    # same content: remember the new mtime so the next run needs no hash
+    entry['mtime_ns'] = mtime_ns
+    return True
+
+
+def finish_object(result, cache=None):
+    _write_output(result['output'])
+    if result['exit_code'] is not None:
+        raise SystemExit(result['exit_code'])
+    if result['plan']:
+        promote_object(result['plan'])
+        if cache is not None:
+            record_processed(result['plan'], cache)
+
+
+def _discard_result(fut):
+    # Remove the cleaned temp file of a finished object that will not be promoted.
+    if fut.cancelled() or fut.exception() is not None:
+        return
+    plan = fut.result()['plan']
+    if plan:
+        try:
+            os.remove(plan.temp)
+        except OSError:
+            pass
+
+
+def _setup_logging(log_file):
+    # Callers only enqueue records; a listener thread formats them and writes the file.
+    handler = logging.FileHandler(log_file)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
 
 def main():
     parser = argparse.ArgumentParser(description='Pipeline: clean then diff fields JSON')
@@ -147,32 +643,51 @@ def main():
     # Download options forwarded to download_campos.py
     parser.add_argument('--target-org', help='sf target org alias to pass to download script')
     parser.add_argument('--only', help='Comma-separated list of objects to download (labels or apiNames)')
-    parser.add_argument('--parallel', type=int, default=1, help='Number of parallel describes for download step')
+    parser.add_argument('--parallel', type=int, help=f'Number of parallel describes for download step (default: min(objects, {download_campos.MAX_PARALLEL}))')
     parser.add_argument('--timeout', type=int, default=120, help='Timeout seconds per describe for download step')
     parser.add_argument('--retries', type=int, default=2, help='Retries per describe for download step')
+    parser.add_argument('--force-refresh', action='store_true',
+                        help='Rewrite every downloaded describe, even when it did not change')
+    parser.add_argument('--use-rest', action='store_true',
+                        help='Download describes over the REST API with the token from `sf org display` instead of one sf call per object')
+    parser.add_argument('--cache-ttl', type=int, default=0,
+                        help='Reuse incoming describes fetched successfully less than this many seconds ago (0 = always download)')
+    parser.add_argument('--skip-unchanged', action='store_true', help='Skip clean/diff/promote for objects whose incoming file is unchanged since the last processed run')
+    parser.add_argument('--compress', action='store_true', help='Gzip the baseline backups written to backup_objects (.json.gz)')
+    parser.add_argument('--no-clean-cache', action='store_true', help='Always re-run the clean step instead of reusing cached output for unchanged incoming files')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes for clean/diff and the CSV export (default: min(objects, CPUs); 1 disables the pool)')
     args = parser.parse_args()
 
+    # Setup logging to a file so we can diagnose unexpected interruptions
+    _setup_logging(os.path.join(THIS_DIR, 'pipeline_run.log'))
+    logging.info('Pipeline started with args: %s', sys.argv[1:])
+
+    for d in (SCRIPTS_DIR, BASELINE_DIR, SIMPLIFIED_DIR, INCOMING_DIR, REPORT_DIR, BACKUP_DIR):
+        os.makedirs(d, exist_ok=True)
+
+    wait_download = download_thread = None
     if not args.skip_download:
-        run_download(target_org=args.target_org, only=args.only, parallel=args.parallel, timeout=args.timeout, retries=args.retries)
+        wait_download, download_thread = start_download(target_org=args.target_org, only=args.only, parallel=args.parallel,
+                                                        timeout=args.timeout, retries=args.retries, cache_ttl=args.cache_ttl,
+                                                        use_rest=args.use_rest, force_refresh=args.force_refresh)
 
     incoming_list = []
     use_map = False
     map_path = None
     if args.new_raw:
-        single = os.path.abspath(args.new_raw)
+        single = _abspath(args.new_raw)
         if not os.path.isfile(single):
             print('New JSON not found:', single)
             raise SystemExit(1)
         incoming_list = [single]
     else:
         default_map = os.path.join(THIS_DIR, 'objects_map.json')
-        map_path = os.path.abspath(args.map) if args.map else (default_map if os.path.isfile(default_map) else None)
+        map_path = _abspath(args.map) if args.map else (default_map if os.path.isfile(default_map) else None)
         if map_path and os.path.isfile(map_path):
             use_map = True
         if use_map:
             try:
-                with open(map_path, 'r', encoding='utf-8') as mf:
-                    map_data = json.load(mf)
+                map_data = load_objects_map(map_path)
             except Exception as e:
                 print('Failed to load map file', map_path, 'error:', e)
                 raise SystemExit(1)
@@ -186,41 +701,27 @@ def main():
                 if not incoming_name:
                     print('Skipping map entry without incoming:', entry)
                     continue
-                incoming_path = incoming_name if os.path.isabs(incoming_name) else os.path.join(INCOMING_DIR, incoming_name)
+                incoming_path = _in_dir(incoming_name, _INCOMING_PREFIX)
                 incoming_list.append(incoming_path)
         else:
-            incoming_list = sorted(glob.glob(os.path.join(INCOMING_DIR, 'incoming-*.json')))
+            if download_thread is not None:
+                # the folder listing below needs the finished download
+                download_thread.join()
+            incoming_list = list_json(INCOMING_DIR, prefix='incoming-')
             if not incoming_list:
                 print('No incoming files found in', INCOMING_DIR)
                 raise SystemExit(1)
-    for d in (SCRIPTS_DIR, BASELINE_DIR, SIMPLIFIED_DIR, INCOMING_DIR, REPORT_DIR, BACKUP_DIR):
-        if not os.path.isdir(d):
-            os.makedirs(d, exist_ok=True)
 
-    # Setup logging to a file so we can diagnose unexpected interruptions
-    log_file = os.path.join(THIS_DIR, 'pipeline_run.log')
-    logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
-    logging.info('Pipeline started with args: %s', sys.argv[1:])
-
-    if not os.path.isfile(CLEANSCRIPT):
-        logging.error('Cleaner script not found: %s', CLEANSCRIPT)
-        print('Cleaner script not found:', CLEANSCRIPT)
-        raise SystemExit(2)
-    if not os.path.isfile(DIFFSCRIPT):
-        logging.error('Diff script not found: %s', DIFFSCRIPT)
-        print('Diff script not found:', DIFFSCRIPT)
-        raise SystemExit(3)
+    global _SAME_FS, _USE_CLEAN_CACHE, _COMPRESS_BACKUPS
+    _COMPRESS_BACKUPS = args.compress
+    _USE_CLEAN_CACHE = not args.no_clean_cache
+    _SAME_FS = _same_filesystem(BASELINE_DIR, SIMPLIFIED_DIR, BACKUP_DIR)
+    if not _SAME_FS:
+        print('Warning: baseline/simplified/backup folders are on different filesystems; promotions will copy files instead of renaming them.')
 
     simplified_main = os.path.join(SIMPLIFIED_DIR, 'simplified-Account.json')
     baseline_main = os.path.join(BASELINE_DIR, 'baseline-Account.json')
 
-    def most_recent_json(dirpath):
-        files = glob.glob(os.path.join(dirpath, '*.json'))
-        if not files:
-            return None
-        files.sort(key=os.path.getmtime, reverse=True)
-        return files[0]
-
     if os.path.isfile(baseline_main):
         baseline_file = baseline_main
         print('Using baseline file:', baseline_file)
@@ -230,103 +731,57 @@ def main():
             print('Using baseline file (recent):', baseline_file)
         else:
             baseline_file = os.path.join(BASELINE_DIR, 'empty_baseline.json')
-            with open(baseline_file, 'w', encoding='utf-8') as fh:
-                json.dump({'fields': []}, fh, indent=2, ensure_ascii=False)
+            with open(baseline_file, 'wb') as fh:
+                fh.write(_EMPTY_BASELINE)
             print('No baseline found, created empty baseline at:', baseline_file)
 
-    if use_map:
-        objs_iter = objs
-    else:
-        # If we have a DOWNLOAD_OBJECTS list from the downloader, prefer using it
-        # so the pipeline processes the same objects the downloader would.
-        if DOWNLOAD_OBJECTS:
-            # If --only was passed, filter the download list accordingly
-            tokens = None
-            if args.only:
-                tokens = [t.strip() for t in args.only.split(',') if t.strip()]
-            objs_iter = []
-            for o in DOWNLOAD_OBJECTS:
-                label = o.get('label') or o.get('apiName')
-                api = o.get('apiName') or label
-                safe = label.replace(' ', '_')
-                # filter by tokens if requested
-                if tokens:
-                    if not (label in tokens or safe in tokens or api in tokens):
-                        continue
-                incoming_basename = f'incoming-{safe}.json'
-                objs_iter.append({'object': safe, 'incoming': incoming_basename, 'simplified': f'simplified-{safe}.json', 'baseline': f'baseline-{safe}.json', 'report': f'report-{safe}.json'})
-        else:
-            objs_iter = []
-            for incoming_path in incoming_list:
-                incoming_basename = os.path.basename(incoming_path)
-                obj_basename = os.path.splitext(incoming_basename)[0]
-                obj_name = obj_basename.split('incoming-', 1)[1] if obj_basename.startswith('incoming-') else obj_basename
-                objs_iter.append({'object': obj_name, 'incoming': incoming_basename, 'simplified': f'simplified-{obj_name}.json', 'baseline': f'baseline-{obj_name}.json', 'report': f'report-{obj_name}.json'})
-
+    run_cache = load_run_cache()
+    entries = list(iter_entries(objs if use_map else None, incoming_list, args.only))
+    # reports left over from an earlier run of the skipped objects are kept out of the export
+    skipped_reports = []
+    plans = iter_plans(entries, args.report, cache=run_cache, skip_unchanged=args.skip_unchanged,
+                       wait=wait_download, skipped=skipped_reports)
+    # the pool starts all its workers up front, so never ask for more than there are objects
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(entries)))
     try:
-        for entry in objs_iter:
-            incoming_name = entry.get('incoming')
-            incoming_path = incoming_name if os.path.isabs(incoming_name) else os.path.join(INCOMING_DIR, incoming_name)
-            if not os.path.isfile(incoming_path):
-                print('Incoming file not found, skipping:', incoming_path)
-                continue
-            obj_name = entry.get('object') or os.path.splitext(os.path.basename(incoming_path))[0].split('incoming-', 1)[-1]
-            logging.info('Starting processing object: %s (incoming: %s)', obj_name, incoming_path)
-            print('\n=== Processing object:', obj_name, '===')
-
-            simplified_name = entry.get('simplified') or f'simplified-{obj_name}.json'
-            baseline_name = entry.get('baseline') or f'baseline-{obj_name}.json'
-            report_name = entry.get('report') or f'report-{obj_name}.json'
-
-            simplified_main_obj = simplified_name if os.path.isabs(simplified_name) else os.path.join(SIMPLIFIED_DIR, simplified_name)
-            baseline_main_obj = baseline_name if os.path.isabs(baseline_name) else os.path.join(BASELINE_DIR, baseline_name)
-            temp_simpl_obj = os.path.join(SIMPLIFIED_DIR, f'simplified-{obj_name}.tmp.json')
-            report_obj = report_name if os.path.isabs(report_name) else os.path.join(REPORT_DIR, report_name)
-
-            if os.path.isfile(baseline_main_obj):
-                baseline_file_obj = baseline_main_obj
-                print('Using baseline file:', baseline_file_obj)
+        if workers > 1:
+            # clean+diff of distinct objects share no state; promotion stays in this
+            # process so renames inside baseline/backup folders never race.
+            print(f'Processing objects with up to {workers} workers...')
+            if not sys.platform.startswith('linux'):
+                ctx = multiprocessing.get_context()
+            elif download_thread is not None and download_thread.is_alive():
+                # forking while the download thread may hold a lock (e.g. stdout's)
+                # can leave a worker deadlocked; start workers from a clean server
+                ctx = multiprocessing.get_context('forkserver')
             else:
-                candidates = sorted(glob.glob(os.path.join(BASELINE_DIR, f'*{obj_name}.json')),
-                                    key=os.path.getmtime, reverse=True)
-                if candidates:
-                    baseline_file_obj = candidates[0]
-                    print('Using baseline file (matched):', baseline_file_obj)
-                else:
-                    baseline_file_obj = os.path.join(BASELINE_DIR, f'empty_baseline_{obj_name}.json')
-                    with open(baseline_file_obj, 'w', encoding='utf-8') as fh:
-                        json.dump({'fields': []}, fh, indent=2, ensure_ascii=False)
-                    print('No baseline found for', obj_name, '- created empty baseline at:', baseline_file_obj)
-
-            print('Cleaning', incoming_path, '->', temp_simpl_obj)
-            logging.info('Cleaning %s -> %s', incoming_path, temp_simpl_obj)
-            run_clean(incoming_path, temp_simpl_obj)
-
-            report_path_obj = args.report if args.report else report_obj
-            print('Comparing baseline -> new simplified for', obj_name)
-            logging.info('Comparing baseline %s -> new simplified %s', baseline_file_obj, temp_simpl_obj)
-            run_diff(baseline_file_obj, temp_simpl_obj, report_path_obj)
-
+                ctx = multiprocessing.get_context('fork')
+            log_queue = ctx.Queue()
+            listener = logging.handlers.QueueListener(log_queue, *logging.getLogger().handlers)
+            listener.start()
             try:
-                if os.path.isfile(temp_simpl_obj):
-                    if os.path.isfile(baseline_main_obj):
-                        bak = os.path.join(BACKUP_DIR, time.strftime(f'backup_%Y%m%dT%H%M%S_baseline-{obj_name}.json'))
-                        try:
-                            shutil.move(baseline_main_obj, bak)
-                            print('Backed up existing baseline to', bak)
-                        except Exception as e:
-                            print('Failed to backup existing baseline:', e)
-                    if os.path.isfile(simplified_main_obj):
-                        try:
-                            shutil.move(simplified_main_obj, baseline_main_obj)
-                            print('Promoted previous simplified -> baseline for', obj_name)
-                        except Exception as e:
-                            print('Failed to promote previous simplified to baseline:', e)
-                    shutil.move(temp_simpl_obj, simplified_main_obj)
-                    print('Updated simplified file for', obj_name, ':', simplified_main_obj)
-            except Exception as e:
-                logging.warning('Failed to finalize promotion for %s: %s', obj_name, e)
-                print('Warning: failed to finalize promotion of simplified/baseline files for', obj_name, e)
+                with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                         initializer=_init_worker, initargs=(log_queue, _USE_CLEAN_CACHE)) as pool:
+                    # plans are built lazily, so the first objects start while the rest are still being resolved
+                    futures = [pool.submit(process_object, plan) for plan in plans]
+                    done = 0
+                    try:
+                        for fut in futures:
+                            finish_object(fut.result(), run_cache)
+                            done += 1
+                    except BaseException:
+                        # stop at the first failure like the serial loop: objects not
+                        # started yet are dropped and the output of those that still
+                        # finished is discarded, since it will never be promoted
+                        pool.shutdown(wait=True, cancel_futures=True)
+                        for fut in futures[done + 1:]:
+                            _discard_result(fut)
+                        raise
+            finally:
+                listener.stop()
+        else:
+            for plan in plans:
+                finish_object(process_object(plan), run_cache)
         # end for
     except KeyboardInterrupt:
         logging.error('Pipeline interrupted by KeyboardInterrupt')
@@ -336,19 +791,27 @@ def main():
     except Exception:
         logging.error('Unhandled exception in pipeline: %s', traceback.format_exc())
         raise
+    finally:
+        # keep what was processed so far, even if a later object failed
+        try:
+            save_run_cache(run_cache)
+        except Exception as e:
+            logging.warning('Failed to write %s: %s', CACHE_PATH, e)
+
+    if download_thread is not None:
+        # describes of objects outside the processed set may still be running
+        download_thread.join()
 
     # After processing all objects, run the CSV exporter to aggregate per-object reports
     try:
         print('\nRunning CSV exporter to aggregate reports...')
         out_csv = os.path.join(REPORT_DIR, 'reports_summary.csv')
         out_modified = os.path.join(REPORT_DIR, 'reports_modified.csv')
-        if os.path.isfile(EXPORTSCRIPT):
-            run_export(REPORT_DIR, SIMPLIFIED_DIR, BASELINE_DIR, out_csv=out_csv, out_modified=out_modified)
-            print('CSV export completed:')
-            print(' -', out_csv)
-            print(' -', out_modified)
-        else:
-            print('Exporter script not found, skipping CSV aggregation:', EXPORTSCRIPT)
+        run_export(REPORT_DIR, SIMPLIFIED_DIR, BASELINE_DIR, out_csv=out_csv, out_modified=out_modified, workers=workers,
+                   exclude=skipped_reports)
+        print('CSV export completed:')
+        print(' -', out_csv)
+        print(' -', out_modified)
     except Exception as e:
         logging.error('CSV export failed: %s', traceback.format_exc())
         print('Warning: CSV export failed:', e)
@@ -1,14 +1,27 @@
 
 import argparse
-import json
 import os
+import re
 import sys
 
+import json_utils
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# The first top-level key tells which shape a file has: simplified files start
+# with "fields", `sf ... --json` output with "status"/"result".
+_FIRST_KEY_RE = re.compile(rb'\A\s*\{\s*"([^"\\]*)"')
+
 
 def _read_json_file_flexible(path):
     """Read a JSON file trying common encodings and BOMs, return parsed object.
 
-    Attempts UTF-8 (with BOM), UTF-16 (LE/BE) and falls back to latin-1 if needed.
+    A BOM decides the encoding outright. Without one the bytes are parsed as
+    UTF-8 directly (no intermediate str); UTF-16 and latin-1 are only tried
+    if that fails.
     """
     with open(path, 'rb') as fh:
         data = fh.read()
@@ -25,29 +38,31 @@ def _read_json_file_flexible(path):
 
     errors = []
     if enc:
+        # the other encodings cannot succeed on BOM-prefixed data, so stop here
         try:
-            text = data.decode(enc)
-            return json.loads(text)
+            if enc == 'utf-8-sig':
+                return json_utils.loads(data[3:])
+            return json_utils.loads(data.decode(enc))
         except Exception as e:
             errors.append((enc, str(e)))
+    else:
+        # Salesforce describes are UTF-8: parse the bytes as-is
+        try:
+            return json_utils.loads(data)
+        except Exception as e:
+            errors.append(('utf-8', str(e)))
 
-    # Try utf-8 first
-    try:
-        return json.loads(data.decode('utf-8'))
-    except Exception as e:
-        errors.append(('utf-8', str(e)))
-
-    # Try utf-16
-    try:
-        return json.loads(data.decode('utf-16'))
-    except Exception as e:
-        errors.append(('utf-16', str(e)))
+        # Try utf-16
+        try:
+            return json_utils.loads(data.decode('utf-16'))
+        except Exception as e:
+            errors.append(('utf-16', str(e)))
 
-    # Last resort: latin-1 (will not preserve unicode but will allow parsing)
-    try:
-        return json.loads(data.decode('latin-1'))
-    except Exception as e:
-        errors.append(('latin-1', str(e)))
+        # Last resort: latin-1 (will not preserve unicode but will allow parsing)
+        try:
+            return json_utils.loads(data.decode('latin-1'))
+        except Exception as e:
+            errors.append(('latin-1', str(e)))
 
     # If we reach here, raise a helpful error
     msg = 'Failed to decode JSON file with tried encodings: ' + ', '.join([f"{enc}:{err}" for enc, err in errors])
@@ -94,50 +109,88 @@ def simplify_field(f):
     return out
 
 
+def _stream_simplified_fields(path):
+    """Simplify fields straight off the file with ijson, one field at a time.
+
+    Peak memory stays at one raw field instead of the whole describe. Only the
+    prefix matching the file's shape is streamed, so the file is parsed once,
+    and a top-level "fields" wins as in find_fields(). Returns None when
+    streaming does not apply (no ijson, a BOM/UTF-16 file, a parse error, or
+    no fields found) so the caller falls back to the full flexible read.
+    """
+    if ijson is None:
+        return None
+    with open(path, 'rb') as fh:
+        head = fh.read(256)
+    if not head or head.startswith((b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff", b"\x00")):
+        return None
+    m = _FIRST_KEY_RE.match(head)
+    prefix = 'fields.item' if m and m.group(1) == b'fields' else 'result.fields.item'
+    try:
+        with open(path, 'rb') as fh:
+            simplified = [simplify_field(f) for f in ijson.items(fh, prefix, use_float=True)]
+    except Exception:
+        return None
+    # an empty or missing list may still leave the other shape to find_fields()
+    return simplified or None
+
+
 def find_fields(obj):
-    if isinstance(obj, dict):
-        if "fields" in obj and isinstance(obj["fields"], list):
-            return obj["fields"]
-        if "result" in obj and isinstance(obj["result"], dict):
-            r = obj["result"]
-            if "fields" in r and isinstance(r["fields"], list):
-                return r["fields"]
-    return []
+    # Top-level "fields" (simplified files) wins over "result.fields" (sf --json output).
+    try:
+        fields = obj.get("fields")
+        if not isinstance(fields, list):
+            fields = obj["result"].get("fields")
+    except (AttributeError, KeyError):
+        return []
+    return fields if isinstance(fields, list) else []
+
+
+def run(input_path, output_path=None, compact=False):
+    """Simplify the describe JSON at `input_path` and write it to `output_path`.
+
+    When `output_path` is omitted the result is written next to the input as
+    `<input>_simplified.json`. `compact=True` writes it without indentation.
+    Returns the number of fields written.
+    """
+    if not os.path.isfile(input_path):
+        raise FileNotFoundError(f"input file not found: {input_path}")
+
+    simplified = _stream_simplified_fields(input_path)
+    if simplified is None:
+        data = _read_json_file_flexible(input_path)
+        simplified = [simplify_field(f) for f in find_fields(data)]
+
+    out_obj = {"fields": simplified}
+
+    out = output_path
+    if not out:
+        base, ext = os.path.splitext(input_path)
+        out = base + "_simplified.json"
+
+    json_utils.dump(out_obj, out, compact=compact)
+
+    print(f"Wrote {len(simplified)} fields to {out}")
+    return len(simplified)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Simplify Salesforce object fields JSON")
     parser.add_argument("input", help="Input JSON file path")
     parser.add_argument("output", nargs="?", help="Output JSON file path (optional)")
+    parser.add_argument("--compact", action="store_true", help="Write compact JSON (no indentation)")
     args = parser.parse_args()
 
-    inp = args.input
-    if not os.path.isfile(inp):
-        print(f"Error: input file not found: {inp}")
-        sys.exit(2)
-
     try:
-        data = _read_json_file_flexible(inp)
+        run(args.input, args.output, compact=args.compact)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
     except Exception as e:
         print('clean_campos.py failed:')
         print(e)
         sys.exit(2)
 
-    fields = find_fields(data)
-    simplified = [simplify_field(f) for f in fields]
-
-    out_obj = {"fields": simplified}
-
-    out = args.output
-    if not out:
-        base, ext = os.path.splitext(inp)
-        out = base + "_simplified.json"
-
-    with open(out, "w", encoding="utf-8") as fh:
-        json.dump(out_obj, fh, ensure_ascii=False, indent=2)
-
-    print(f"Wrote {len(simplified)} fields to {out}")
-
 
 if __name__ == "__main__":
     main()
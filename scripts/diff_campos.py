@@ -3,11 +3,43 @@ import sys
 import os
 import argparse
 from collections import defaultdict
+from functools import lru_cache
+
+import json_utils
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Files at least this big are read field by field with ijson (when installed)
+# instead of being loaded whole; below it orjson's one-shot parse is faster.
+_STREAM_MIN_BYTES = 8 << 20
+
+
+def _stream_fields(path):
+    with open(path, 'rb') as fh:
+        return {f.get('name'): f for f in ijson.items(fh, 'fields.item', use_float=True) if f.get('name')}
 
 
 def load_fields(path):
-    with open(path, 'r', encoding='utf-8') as fh:
-        data = json.load(fh)
+    """Return {field name: field} for the simplified file at `path`.
+
+    Results are memoized per (path, mtime, size), so asking again for a file
+    that has not changed skips the parse; treat the dict as read-only.
+    """
+    st = os.stat(path)
+    return _load_fields(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _load_fields(path, mtime_ns, size):
+    if ijson is not None and size >= _STREAM_MIN_BYTES and not path.endswith('.gz'):
+        try:
+            return _stream_fields(path)
+        except Exception:
+            pass  # e.g. a BOM ijson cannot handle; the full load below reports real errors
+    data = json_utils.load(path)
     fields = data.get('fields', []) if isinstance(data, dict) else []
     by_name = {f.get('name'): f for f in fields if f.get('name')}
     return by_name
@@ -26,78 +58,96 @@ def picklist_map(picklist_values):
 
 
 def compare_picklists(old_list, new_list):
-    # Build maps keyed by label (matching should be done by label, not by value)
+    # Build maps keyed by label (matching should be done by label, not by value).
+    # Entries are (value, active) tuples; the report dicts are only built for
+    # the labels that end up in added/removed/changed.
     def map_by_label(lst):
         m = {}
         for pv in lst or []:
             if not isinstance(pv, dict):
                 # pv may be a plain token (value or label); use string as label key
                 key = str(pv)
-                m.setdefault(key, {'label': key, 'value': key, 'active': None})
+                m.setdefault(key, (key, None))
                 continue
-            lab = pv.get('label') if pv.get('label') is not None else (pv.get('value') if pv.get('value') is not None else '')
-            # prefer explicit label when available
-            key = lab
-            # store value and active
-            m[key] = {'label': lab, 'value': pv.get('value'), 'active': pv.get('active')}
+            value = pv.get('value')
+            lab = pv.get('label')
+            if lab is None:
+                lab = value if value is not None else ''
+            m[lab] = (value, pv.get('active'))
         return m
 
+    def entry(lab, vals):
+        return {'label': lab, 'value': vals[0], 'active': vals[1]}
+
     old_map = map_by_label(old_list)
     new_map = map_by_label(new_list)
-    old_labels = set(old_map.keys())
-    new_labels = set(new_map.keys())
     # For added/removed we want to return rich objects (dicts) when possible so
     # downstream code (exporter) can display label/value/active consistently.
-    added = [new_map[l] for l in sorted(list(new_labels - old_labels))]
-    removed = [old_map[l] for l in sorted(list(old_labels - new_labels))]
+    # (dict key views support set operations directly)
+    added = [entry(l, new_map[l]) for l in sorted(new_map.keys() - old_map.keys())]
+    removed = [entry(l, old_map[l]) for l in sorted(old_map.keys() - new_map.keys())]
     changed = []
-    for lab in old_labels & new_labels:
-        o = old_map.get(lab, {})
-        n = new_map.get(lab, {})
+    for lab, o in old_map.items():
+        n = new_map.get(lab)
+        if n is None or o == n:
+            continue
         # consider changed if value or active differ
-        if (o.get('value') != n.get('value')) or (bool(o.get('active')) != bool(n.get('active'))):
+        if o[0] != n[0] or bool(o[1]) != bool(n[1]):
             # keep 'value' field containing the identity token (label) for compatibility
-            changed.append({'value': lab, 'old': o, 'new': n})
+            changed.append({'value': lab, 'old': entry(lab, o), 'new': entry(lab, n)})
     return {'added': added, 'removed': removed, 'changed': changed}
 
 
 def compare_references(old_ref, new_ref):
     old_set = set(old_ref or [])
     new_set = set(new_ref or [])
-    return {'added': sorted(list(new_set - old_set)), 'removed': sorted(list(old_set - new_set))}
+    return {'added': sorted(new_set - old_set), 'removed': sorted(old_set - new_set)}
 
 
-def compare_field(old, new):
-    diffs = []
-    keys_to_check = ['label', 'custom', 'type', 'precision', 'scale', 'length']
-    for k in keys_to_check:
-        o = old.get(k) if old else None
-        n = new.get(k) if new else None
-        if o != n:
-            diffs.append({'attribute': k, 'old': o, 'new': n})
+# plain attributes compared one by one, in report order
+_ATTRS = ('label', 'custom', 'type', 'precision', 'scale', 'length')
+_NO_ATTRS = (None,) * len(_ATTRS)
 
-    pick_diff = compare_picklists(old.get('picklistValues') if old else [], new.get('picklistValues') if new else [])
-    if pick_diff['added'] or pick_diff['removed'] or pick_diff['changed']:
-        diffs.append({'attribute': 'picklistValues', 'detail': pick_diff})
 
-    ref_diff = compare_references(old.get('referenceTo') if old else [], new.get('referenceTo') if new else [])
-    if ref_diff['added'] or ref_diff['removed']:
-        diffs.append({'attribute': 'referenceTo', 'detail': ref_diff})
+def compare_field(old, new):
+    # Most fields are unchanged between pulls; dict equality settles that in C.
+    if old is new or old == new:
+        return []
+    diffs = []
+    old_vals = tuple(map(old.get, _ATTRS)) if old else _NO_ATTRS
+    new_vals = tuple(map(new.get, _ATTRS)) if new else _NO_ATTRS
+    if old_vals != new_vals:
+        for k, o, n in zip(_ATTRS, old_vals, new_vals):
+            if o != n:
+                diffs.append({'attribute': k, 'old': o, 'new': n})
+
+    old_picks = old.get('picklistValues') if old else []
+    new_picks = new.get('picklistValues') if new else []
+    if old_picks != new_picks:
+        pick_diff = compare_picklists(old_picks, new_picks)
+        if pick_diff['added'] or pick_diff['removed'] or pick_diff['changed']:
+            diffs.append({'attribute': 'picklistValues', 'detail': pick_diff})
+
+    old_refs = old.get('referenceTo') if old else []
+    new_refs = new.get('referenceTo') if new else []
+    if old_refs != new_refs:
+        ref_diff = compare_references(old_refs, new_refs)
+        if ref_diff['added'] or ref_diff['removed']:
+            diffs.append({'attribute': 'referenceTo', 'detail': ref_diff})
 
     return diffs
 
 
 def make_report(old_by_name, new_by_name):
-    old_names = set(old_by_name.keys())
-    new_names = set(new_by_name.keys())
-    added = sorted(list(new_names - old_names))
-    removed = sorted(list(old_names - new_names))
-    common = sorted(list(old_names & new_names))
+    added = sorted(new_by_name.keys() - old_by_name.keys())
+    removed = sorted(old_by_name.keys() - new_by_name.keys())
+    # Compare in set order and sort only the (few) modified names afterwards
     modified = {}
-    for name in common:
+    for name in old_by_name.keys() & new_by_name.keys():
         diffs = compare_field(old_by_name.get(name, {}), new_by_name.get(name, {}))
         if diffs:
             modified[name] = {'old': old_by_name.get(name), 'new': new_by_name.get(name), 'diffs': diffs}
+    modified = {name: modified[name] for name in sorted(modified)}
     # helper to extract requested metadata keys from a field dict
     def _meta_from_field(f):
         if not isinstance(f, dict):
@@ -132,8 +182,8 @@ def make_report(old_by_name, new_by_name):
 
     report = {
         'summary': {
-            'fields_old': len(old_names),
-            'fields_new': len(new_names),
+            'fields_old': len(old_by_name),
+            'fields_new': len(new_by_name),
             'added': len(added_meta),
             'removed': len(removed_meta),
             'modified': len(modified),
@@ -146,14 +196,11 @@ def make_report(old_by_name, new_by_name):
 
 
 def print_summary(report):
+    # Lines are collected and written in one go at the end
+    out = []
+
     def _safe_print(*parts, sep=' ', end='\n'):
-        s = sep.join(str(p) for p in parts) + end
-        try:
-            # normal print (may raise UnicodeEncodeError on some consoles)
-            sys.stdout.write(s)
-        except UnicodeEncodeError:
-            # write bytes utf-8 replacing unencodable chars
-            sys.stdout.buffer.write(s.encode('utf-8', errors='replace'))
+        out.append(sep.join(str(p) for p in parts) + end)
 
     s = report.get('summary', {})
     _safe_print('Old fields:', s.get('fields_old'))
@@ -202,6 +249,15 @@ def print_summary(report):
                 else:
                     _safe_print('    -', d['attribute'], '->', 'old:', d.get('old'), 'new:', d.get('new'))
 
+    text = ''.join(out)
+    try:
+        # normal write (may raise UnicodeEncodeError on some consoles)
+        sys.stdout.write(text)
+    except UnicodeEncodeError:
+        # write bytes utf-8 replacing unencodable chars
+        sys.stdout.flush()
+        sys.stdout.buffer.write(text.encode('utf-8', errors='replace'))
+
 
 def format_summary(report):
     """Return a human-readable string similar to the terminal output produced by print_summary."""
@@ -260,29 +316,37 @@ def format_summary(report):
     return '\n'.join(out_lines)
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Compare two simplified Salesforce fields JSON files')
-    parser.add_argument('old', help='Old JSON file path')
-    parser.add_argument('new', help='New JSON file path')
-    parser.add_argument('report', nargs='?', help='Optional output report JSON path')
-    args = parser.parse_args()
+def run(old_path, new_path, report_path=None):
+    """Compare two simplified JSON files, print the summary and optionally write the report.
 
-    old_by_name = load_fields(args.old)
-    new_by_name = load_fields(args.new)
+    Returns the report dict.
+    """
+    old_by_name = load_fields(old_path)
+    new_by_name = load_fields(new_path)
 
     report = make_report(old_by_name, new_by_name)
 
     print_summary(report)
 
-    if args.report:
+    if report_path:
         # embed a human-readable text version into the JSON report
         try:
             report['text_report'] = format_summary(report)
         except Exception:
             report['text_report'] = ''
-        with open(args.report, 'w', encoding='utf-8') as fh:
-            json.dump(report, fh, ensure_ascii=False, indent=2)
-        print('\nWrote report to', args.report)
+        json_utils.dump(report, report_path)
+        print('\nWrote report to', report_path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare two simplified Salesforce fields JSON files')
+    parser.add_argument('old', help='Old JSON file path')
+    parser.add_argument('new', help='New JSON file path')
+    parser.add_argument('report', nargs='?', help='Optional output report JSON path')
+    args = parser.parse_args()
+
+    run(args.old, args.new, args.report)
 
 
 if __name__ == '__main__':
@@ -1,9 +1,31 @@
 import os
 import argparse
+import random
 import subprocess
+import sys
 import json
+import gzip
+import hashlib
+import http.client
+import re
+import shlex
+import shutil
+import threading
+import time
+import urllib.parse
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
+from functools import lru_cache
+
+import json_utils
+
+# default number of simultaneous describes (Salesforce allows 25 concurrent
+# long-running API requests per org)
+MAX_PARALLEL = 16
+
+# retry backoff: jittered exponential, capped; at least RATE_LIMIT_BACKOFF seconds
+# when the org reports its API limit (so parallel jobs don't retry in lockstep)
+MAX_BACKOFF = 30
+RATE_LIMIT_BACKOFF = 30
 
 login_cmd = "sf force:auth:web:login -a pluz--dev -d --instance-url https://pluz--dev.sandbox.my.salesforce.com/"
 
@@ -53,8 +75,7 @@ def load_objects_map(map_path):
         print(f'No map file found at {map_path}; using default object list')
         return None
     try:
-        with open(map_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = json_utils.load(map_path)
     except Exception as e:
         print(f'Failed to read objects map {map_path}: {e}; using default list')
         return None
@@ -74,11 +95,33 @@ def load_objects_map(map_path):
     print(f'Loaded {len(objs)} objects from {map_path}')
     return objs
 
+@lru_cache(maxsize=None)
+def sf_command():
+    """argv prefix that runs the sf CLI directly, without a shell in between.
+
+    Resolved once per process; on Windows `sf` is usually an sf.cmd or sf.ps1 shim.
+    """
+    for name in ('sf', 'sf.cmd', 'sf.ps1'):
+        path = shutil.which(name)
+        if path:
+            if path.lower().endswith('.ps1'):
+                return ('powershell', '-NoProfile', '-File', path)
+            return (path,)
+    return ('sf',)
+
+
 def run_cmd(cmd, dry_run=False):
     print(cmd)
     if dry_run:
         return 0
-    proc = subprocess.run(cmd, shell=True)
+    argv = shlex.split(cmd)
+    if argv and argv[0] == 'sf':
+        argv[:1] = sf_command()
+    try:
+        proc = subprocess.run(argv)
+    except FileNotFoundError:
+        print(f'Command not found: {argv[0]}')
+        return 127
     return proc.returncode
 
 
@@ -96,48 +139,314 @@ def run_cmd_list(cmd_list, timeout=None, dry_run=False):
         return -1, b'', f'timeout after {timeout}s'.encode()
 
 
+def rest_auth(target_org=None, timeout=120):
+    """(instance_url, access_token, api_version) for --use-rest, from `sf org display`.
+
+    Returns None (after printing why) when the org details cannot be read; the
+    caller then keeps using the sf CLI describe.
+    """
+    cmd = [*sf_command(), 'org', 'display', '--json']
+    if target_org:
+        cmd += ['--target-org', target_org]
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+        parsed = json.loads(proc.stdout or b'{}')
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        print(f'Could not read org details for --use-rest: {e}')
+        return None
+    # valid JSON that is not the expected object (e.g. a bare string) counts as no details
+    info = parsed.get('result') if isinstance(parsed, dict) else None
+    if not isinstance(info, dict) or not isinstance(info.get('instanceUrl'), str) \
+            or not info['instanceUrl'] or not info.get('accessToken'):
+        print('sf org display returned no instanceUrl/accessToken; using the sf CLI describe instead')
+        return None
+    return (info['instanceUrl'].rstrip('/'), info['accessToken'], info.get('apiVersion') or '60.0')
+
+
+# one keep-alive connection to the org per download thread
+_rest_conn = threading.local()
+
+
+def _rest_describe(rest, api, out, timeout, etag=None):
+    """GET the describe of `api` into `out`; returns (status, error body, etag).
+
+    The body is wrapped as {"status":0,"result":...} so the file looks like the
+    `sf ... --json` output the rest of the pipeline reads. With `etag` the request
+    is conditional and a 304 means the describe did not change (nothing written).
+    """
+    instance_url, token, version = rest
+    conn = getattr(_rest_conn, 'conn', None)
+    if conn is None:
+        url = urllib.parse.urlsplit(instance_url)
+        cls = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        conn = _rest_conn.conn = cls(url.netloc, timeout=timeout)
+    try:
+        headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json', 'Accept-Encoding': 'gzip'}
+        if etag:
+            headers['If-None-Match'] = etag
+        conn.request('GET', f'/services/data/v{version}/sobjects/{urllib.parse.quote(api)}/describe', headers=headers)
+        resp = conn.getresponse()
+        body = gzip.GzipFile(fileobj=resp) if resp.getheader('Content-Encoding') == 'gzip' else resp
+        if resp.status != 200:
+            return resp.status, body.read(), None
+        out.write(b'{"status":0,"result":')
+        shutil.copyfileobj(body, out, 1 << 20)
+        out.write(b'}')
+        return 200, b'', resp.getheader('ETag')
+    except BaseException:
+        # drop a connection left mid-response; the next attempt reconnects
+        conn.close()
+        _rest_conn.conn = None
+        raise
+
+
+# incoming_dir -> {api: {"fetched_at": ..., "etag": ..., "sha256": ...}}, persisted
+# as <incoming_dir>/.describe_cache.json: when each describe last succeeded (for
+# --cache-ttl; the file's mtime only moves when its content changes) and, with
+# --use-rest, the ETag of the describe on disk
+DESCRIBE_CACHE_NAME = '.describe_cache.json'
+_describe_cache = {}
+_describe_cache_lock = threading.Lock()
+
+
+def _describe_entries(incoming_dir):
+    with _describe_cache_lock:
+        entries = _describe_cache.get(incoming_dir)
+        if entries is None:
+            try:
+                with open(os.path.join(incoming_dir, DESCRIBE_CACHE_NAME), 'rb') as fh:
+                    entries = json.loads(fh.read())
+            except (OSError, ValueError):
+                entries = {}
+            if not isinstance(entries, dict):
+                entries = {}
+            entries = {api: entry for api, entry in entries.items() if isinstance(entry, dict)}
+            _describe_cache[incoming_dir] = entries
+        return entries
+
+
+def save_describe_cache():
+    """Write the fetch times and ETags recorded by describe_object back to each incoming folder."""
+    with _describe_cache_lock:
+        for incoming_dir, entries in _describe_cache.items():
+            path = os.path.join(incoming_dir, DESCRIBE_CACHE_NAME)
+            try:
+                with open(path + '.tmp', 'w', encoding='utf-8') as fh:
+                    json.dump(entries, fh, indent=2, sort_keys=True)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                _progress(f'Could not write {path}: {e}')
+
+
+def _sha256_of(path):
+    try:
+        with open(path, 'rb') as fh:
+            return hashlib.file_digest(fh, 'sha256').hexdigest() if hasattr(hashlib, 'file_digest') \
+                else hashlib.sha256(fh.read()).hexdigest()
+    except OSError:
+        return None
+
+
+# sf --json output (and the REST wrapper) starts with the status: 0 on success
+_OK_HEAD_RE = re.compile(rb'\A\s*\{\s*"status"\s*:\s*0\s*[,}]')
+
+
+def _is_successful_describe(path):
+    """True if `path` holds a successful describe (not sf's error JSON)."""
+    try:
+        with open(path, 'rb') as fh:
+            return _OK_HEAD_RE.match(fh.read(256)) is not None
+    except OSError:
+        return False
+
+
+def _same_content(path_a, path_b):
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+        with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+            while True:
+                chunk = a.read(1 << 20)
+                if chunk != b.read(1 << 20):
+                    return False
+                if not chunk:
+                    return True
+    except OSError:
+        return False
+
+
+def incoming_path(obj, incoming_dir):
+    """Path of the describe file written for `obj` under `incoming_dir`."""
+    label = obj.get('label') or obj.get('apiName')
+    return os.path.join(incoming_dir, f"incoming-{label.replace(' ', '_')}.json")
+
+
+def _progress(line):
+    # One write per line: print() writes the text and the newline separately, so
+    # lines from parallel describes (and the pipeline's own output) could interleave.
+    sys.stdout.write(line + '\n')
+
+
 # describe_object usando stdout a archivo y reintentos
-def describe_object(obj, incoming_dir, target_org=None, dry_run=False, timeout=120, retries=2):
+def describe_object(obj, incoming_dir, target_org=None, dry_run=False, timeout=120, retries=2, cache_ttl=0,
+                    rest=None, force_refresh=False):
     label = obj.get('label') or obj.get('apiName')
     api = obj.get('apiName') or obj.get('label')
-    safe_label = label.replace(' ', '_')
-    out_path = os.path.join(incoming_dir, f'incoming-{safe_label}.json')
+    out_path = incoming_path(obj, incoming_dir)
 
-    cmd = ['sf', 'force:schema:sobject:describe', '--sobjecttype', api, '--json']
-    if target_org:
-        cmd += ['--target-org', target_org]
+    # a describe fetched successfully less than cache_ttl seconds ago is reused as is;
+    # a failed download leaves sf's error JSON behind, which is always retried
+    if cache_ttl and not dry_run:
+        fetched_at = _describe_entries(incoming_dir).get(api, {}).get('fetched_at')
+        if isinstance(fetched_at, (int, float)) and time.time() - fetched_at < cache_ttl \
+                and _is_successful_describe(out_path):
+            _progress(f'Using cached {out_path}')
+            return (label, 0)
+
+    if rest is not None:
+        # --use-rest: plain HTTPS describe, no sf process per object (see rest_auth)
+        cmd = ['GET', f'{rest[0]}/services/data/v{rest[2]}/sobjects/{api}/describe']
+    else:
+        cmd = [*sf_command(), 'force:schema:sobject:describe', '--sobjecttype', api, '--json']
+        if target_org:
+            cmd += ['--target-org', target_org]
 
-    print(f'Downloading {label} ({api}) -> {out_path}')
+    part_path = out_path + '.part'
+    etag = None
+    if rest is not None and not force_refresh:
+        entry = _describe_entries(incoming_dir).get(api)
+        # the ETag only holds while the file on disk is still the describe it came with
+        if entry and entry.get('etag') and entry.get('sha256') == _sha256_of(out_path):
+            etag = entry['etag']
+
+    _progress(f'Downloading {label} ({api}) -> {out_path}')
     attempt = 0
     while attempt <= retries:
         attempt += 1
+        limited = False
         if dry_run:
-            print('DRY-RUN:', ' '.join(cmd), '>', out_path)
+            _progress(f"DRY-RUN: {' '.join(cmd)} > {out_path}")
             return (label, 0)
         try:
-            # Open file and stream stdout there
-            with open(out_path, 'wb') as f:
-                try:
+            # Stream into a side file; the incoming file is only replaced when the
+            # describe changed, so unchanged objects keep their mtime (and caches)
+            unchanged = False
+            with open(part_path, 'wb') as f:
+                if rest is not None:
+                    status, err, new_etag = _rest_describe(rest, api, f, timeout, etag)
+                    unchanged = status == 304
+                    rc = 0 if status in (200, 304) else status
+                else:
                     proc = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, timeout=timeout)
-                except FileNotFoundError:
-                    # On Windows the `sf` entry may be a PowerShell shim (sf.ps1). In that case
-                    # launching the literal 'sf' as an executable can raise FileNotFoundError.
-                    # Fall back to running the full command line via the shell.
-                    target_part = f' --target-org {target_org}' if target_org else ''
-                    cmd_line = f'sf force:schema:sobject:describe --sobjecttype "{api}" --json{target_part}'
-                    proc = subprocess.run(cmd_line, stdout=f, stderr=subprocess.PIPE, timeout=timeout, shell=True)
-            if proc.returncode == 0:
+                    rc, err = proc.returncode, proc.stderr
+            if rc == 0:
+                if unchanged or (not force_refresh and _same_content(part_path, out_path)):
+                    os.remove(part_path)
+                    _progress(f'{label} unchanged, kept {out_path}')
+                else:
+                    os.replace(part_path, out_path)
+                entries = _describe_entries(incoming_dir)
+                sha256 = _sha256_of(out_path) if rest is not None and not unchanged and new_etag else None
+                with _describe_cache_lock:
+                    entry = entries.setdefault(api, {})
+                    entry['fetched_at'] = time.time()
+                    if rest is not None and not unchanged:
+                        if new_etag:
+                            entry.update(etag=new_etag, sha256=sha256)
+                        else:
+                            entry.pop('etag', None)
+                            entry.pop('sha256', None)
                 return (label, 0)
             else:
-                err = proc.stderr.decode(errors='ignore') if proc.stderr else ''
-                print(f'Attempt {attempt} failed for {api}: rc={proc.returncode} err={err}')
-        except subprocess.TimeoutExpired:
-            print(f'Attempt {attempt} timed out after {timeout}s for {api}')
-        # small backoff before retry
-        import time; time.sleep(1 + attempt)
+                err = err.decode(errors='ignore') if err else ''
+                limited = rc in (429, 503) or 'REQUEST_LIMIT_EXCEEDED' in err
+                _progress(f'Attempt {attempt} failed for {api}: rc={rc} err={err}')
+        except FileNotFoundError:
+            _progress(f'sf CLI not found on PATH; cannot download {api}')
+            break
+        except (subprocess.TimeoutExpired, TimeoutError):
+            _progress(f'Attempt {attempt} timed out after {timeout}s for {api}')
+        except (OSError, http.client.HTTPException) as e:
+            _progress(f'Attempt {attempt} failed for {api}: {e}')
+        if attempt > retries:
+            break
+        delay = min(MAX_BACKOFF, 2 ** attempt) * (0.5 + random.random())
+        if limited:
+            delay = max(delay, RATE_LIMIT_BACKOFF)
+        time.sleep(delay)
+    if os.path.exists(part_path):
+        if rest is not None:
+            # a failed REST describe writes no body; keep the previous describe, if any
+            os.remove(part_path)
+        else:
+            # as before, a describe that never succeeded leaves sf's error output in place
+            os.replace(part_path, out_path)
     return (label, 1)
 
 
+def resolve_objects(map_path):
+    """Objects to download: those in `map_path` when it loads, else the default list."""
+    if map_path:
+        loaded = load_objects_map(map_path)
+        if loaded:
+            return loaded
+    return objects
+
+
+def build_jobs(objects_to_use, incoming_dir, only=None, target_org=None, dry_run=False, timeout=120, retries=2,
+               cache_ttl=0, rest=None, force_refresh=False):
+    """describe_object() argument tuples, optionally limited to the `only` labels/apiNames."""
+    selected = None
+    if only:
+        tokens = frozenset(t.strip() for t in only.split(',') if t.strip())
+        selected = []
+        for o in objects_to_use:
+            label = o.get('label') or o.get('apiName')
+            safe = label.replace(' ', '_')
+            api = o.get('apiName') or label
+            if not tokens.isdisjoint((label, safe, api)):
+                selected.append(o)
+        if not selected:
+            print('Warning: --only specified but no objects matched. Proceeding with full list.')
+            selected = None
+
+    # One job per incoming file: a map listing the same object twice would otherwise
+    # run two describes writing the same file at once. Objects sharing an apiName
+    # under different labels still get one file (and describe) each.
+    by_path = {}
+    for obj in (selected if selected is not None else objects_to_use):
+        by_path.setdefault(incoming_path(obj, incoming_dir), obj)
+    return [(obj, incoming_dir, target_org, dry_run, timeout, retries, cache_ttl, rest, force_refresh)
+            for obj in by_path.values()]
+
+
+def iter_describe(jobs, parallel=None):
+    """Run the describe jobs, yielding (label, rc, out_path) as each one finishes.
+
+    `parallel=None` runs up to MAX_PARALLEL describes at once: they mostly wait
+    on the org, so the CPU count is not the limit.
+    """
+    if parallel is None:
+        parallel = min(len(jobs), MAX_PARALLEL)
+    parallel = max(parallel or 1, 1)
+    if parallel > 1:
+        _progress(f'Running {len(jobs)} describe requests with {parallel} workers...')
+    # one worker runs the jobs one by one, in order, through the same code path
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as ex:
+            futures = {ex.submit(describe_object, *job): job for job in jobs}
+            for fut in as_completed(futures):
+                obj, incoming_dir = futures[fut][:2]
+                try:
+                    label, rc = fut.result()
+                except Exception as e:
+                    _progress(f'Job failed: {e}')
+                    label, rc = obj.get('label') or obj.get('apiName'), 1
+                yield label, rc, incoming_path(obj, incoming_dir)
+    finally:
+        save_describe_cache()
+
+
 def main():
     parser = argparse.ArgumentParser(description='Download sobject describes to incoming_objects using sf CLI')
     parser.add_argument('--fields-dir', default='.', help='Base folder to write incoming_objects')
@@ -146,9 +455,15 @@ def main():
     parser.add_argument('--login-cmd', default=login_cmd, help='Custom login command')
     parser.add_argument('--target-org', help='sf alias or username to pass as --target-org')
     parser.add_argument('--dry-run', action='store_true', help='Print commands without executing')
-    parser.add_argument('--parallel', type=int, default=4, help='Number of parallel describe requests')
+    parser.add_argument('--parallel', type=int, help=f'Number of parallel describe requests (default: min(objects, {MAX_PARALLEL}))')
     parser.add_argument('--timeout', type=int, default=120, help='Timeout (seconds) for each sf call')
     parser.add_argument('--retries', type=int, default=2, help='Number of retries on timeout/failure')
+    parser.add_argument('--cache-ttl', type=int, default=0,
+                        help='Reuse an incoming describe fetched successfully less than this many seconds ago (0 = always download)')
+    parser.add_argument('--force-refresh', action='store_true',
+                        help='Rewrite every incoming describe, even when it did not change')
+    parser.add_argument('--use-rest', action='store_true',
+                        help='Fetch describes over the REST API with the org token from `sf org display` (one sf call in total)')
     parser.add_argument('--only', help='Comma-separated list of object labels or apiNames to download (limits to subset)')
     parser.add_argument('--plan-only', action='store_true', help='Print planned commands and exit (no threads, no subprocesses)')
     args = parser.parse_args()
@@ -158,14 +473,7 @@ def main():
 
     # Attempt to load objects map (path is relative to fields_dir by default)
     map_path = os.path.join(fields_dir, args.map) if args.map else None
-    if map_path:
-        loaded = load_objects_map(map_path)
-        if loaded:
-            objects_to_use = loaded
-        else:
-            objects_to_use = objects
-    else:
-        objects_to_use = objects
+    objects_to_use = resolve_objects(map_path)
 
     if args.login:
         print('Running login command...')
@@ -175,68 +483,35 @@ def main():
             run_cmd(args.login_cmd, dry_run=False)
 
     # create import fields directory
-    if not os.path.exists(fields_dir):
-        os.makedirs(fields_dir)
-    if not os.path.exists(incoming_dir):
-        os.makedirs(incoming_dir)
+    os.makedirs(incoming_dir, exist_ok=True)
 
-    # Prepare jobs (include timeout and retries). Optionally filter via --only
-    selected = None
-    if args.only:
-        tokens = [t.strip() for t in args.only.split(',') if t.strip()]
-        selected = []
-        for o in objects_to_use:
-            label = o.get('label') or o.get('apiName')
-            safe = label.replace(' ', '_')
-            api = o.get('apiName') or label
-            if label in tokens or safe in tokens or api in tokens:
-                selected.append(o)
-        if not selected:
-            print('Warning: --only specified but no objects matched. Proceeding with full list.')
-            selected = None
+    rest = None
+    if args.use_rest and not (args.dry_run or args.plan_only):
+        rest = rest_auth(args.target_org, timeout=args.timeout)
 
-    jobs = []
-    for obj in (selected if selected is not None else objects_to_use):
-        jobs.append((obj, incoming_dir, args.target_org, args.dry_run, args.timeout, args.retries))
+    # Prepare jobs (include timeout and retries). Optionally filter via --only
+    jobs = build_jobs(objects_to_use, incoming_dir, only=args.only, target_org=args.target_org,
+                      dry_run=args.dry_run, timeout=args.timeout, retries=args.retries,
+                      cache_ttl=args.cache_ttl, rest=rest, force_refresh=args.force_refresh)
 
     # Plan-only: print the exact commands that would run, but don't spawn threads or subprocesses
     if args.plan_only:
         if args.login:
             print('Planned login command:')
             print(args.login_cmd)
-        for obj, incoming_dir, target_org, dry_run, timeout, retries in jobs:
-            label = obj.get('label') or obj.get('apiName')
+        for obj, incoming_dir, target_org, *_ in jobs:
             api = obj.get('apiName') or obj.get('label')
-            safe_label = label.replace(' ', '_')
-            out_path = os.path.join(incoming_dir, f'incoming-{safe_label}.json')
-            cmd = ['sf', 'force:schema:sobject:describe', '--sobjecttype', api, '--json']
+            out_path = incoming_path(obj, incoming_dir)
+            cmd = [*sf_command(), 'force:schema:sobject:describe', '--sobjecttype', api, '--json']
             if target_org:
                 cmd += ['--target-org', target_org]
             print('DRY-PLAN:', ' '.join(cmd), '>', out_path)
         return
 
-    # Run in parallel
-    if args.parallel and args.parallel > 1:
-        print(f'Running {len(jobs)} describe requests with {args.parallel} workers...')
-        results = []
-        with ThreadPoolExecutor(max_workers=args.parallel) as ex:
-            futures = [ex.submit(describe_object, *job) for job in jobs]
-            for fut in as_completed(futures):
-                try:
-                    res = fut.result()
-                    results.append(res)
-                except Exception as e:
-                    print('Job failed:', e)
-        # summary
-        for label, rc in results:
-            status = 'OK' if rc == 0 else f'ERR({rc})'
-            print(f'{label}: {status}')
-    else:
-        # sequential
-        for job in jobs:
-            label, rc = describe_object(job[0], job[1], target_org=job[2], dry_run=job[3], timeout=job[4], retries=job[5])
-            status = 'OK' if rc == 0 else f'ERR({rc})'
-            print(f'{label}: {status}')
+    # Run (in parallel when --parallel > 1); status lines print as each describe finishes
+    for label, rc, _ in iter_describe(jobs, args.parallel):
+        status = 'OK' if rc == 0 else f'ERR({rc})'
+        print(f'{label}: {status}')
 
     print('Done.')
 
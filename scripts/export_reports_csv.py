@@ -9,67 +9,138 @@ Each row corresponds to a single field-level change (added/removed/modified).
 """
 
 import argparse
+import collections
 import csv
 import json
+import operator
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import json_utils
+
+# One summary row. Each CSV picks its own columns from these fields; anything a
+# row does not set is written as ''. parent_change_type is the change_type of
+# the field-level row a per-option picklist row was expanded from (None if not set);
+# picklist_added/picklist_removed hold that row's options as (label, value, active).
+Row = collections.namedtuple('Row', [
+    'objeto', 'change_type', 'parent_change_type', 'api_name', 'label', 'type',
+    'attribute', 'old', 'new', 'detail', 'picklist_added', 'picklist_removed',
+    'picklist_value_label', 'picklist_value_api', 'picklist_value_active',
+    'fields_old', 'fields_new', 'added_count', 'removed_count', 'modified_count',
+], defaults=('', '', None, '', '', '', '', '', '', '', (), (), '', '', '', '', '', '', '', ''))
 
 
 def _load_json(path: Path) -> Optional[Any]:
     try:
-        with path.open('r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
+        with path.open('rb') as f:
+            data = f.read()
+    except OSError:
         return None
+    try:
+        return json_utils.loads(data)
     except Exception:
+        pass
+    # slow path, only for files the fast parser rejects: stdlib json on UTF-8
+    # text (it accepts a few inputs orjson does not, e.g. lone surrogates), then latin-1
+    for encoding in ('utf-8', 'latin-1'):
         try:
-            with path.open('r', encoding='latin-1') as f:
-                return json.load(f)
+            return json.loads(data.decode(encoding))
         except Exception:
-            return None
+            continue
+    return None
 
 
-def _search_field_in_data(data: Any, field_name: str) -> Optional[Dict[str, Any]]:
-    if data is None:
+def _compact_json(obj: Any) -> str:
+    """Same text as json.dumps(obj, ensure_ascii=False, separators=(',', ':'))."""
+    try:
+        return json_utils.dumps(obj, compact=True).decode('utf-8')
+    except TypeError:
+        # e.g. integers beyond 64 bits, which orjson refuses
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def _index_fields(data: Any) -> Dict[str, Dict[str, Any]]:
+    """Map every field name in `data` to its metadata dict, in one pass.
+
+    Gives the answer a depth-first search for each name would: a dict nested
+    under the name as a key wins over a dict whose name/apiName/field/fullName
+    matches, earlier nodes (pre-order) win over later ones, and an empty dict
+    under the name hides any match in the rest of that subtree.
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    stack = [(data, frozenset())]
+    while stack:
+        node, hidden = stack.pop()
+        if isinstance(node, dict):
+            empty = set()
+            for k, v in node.items():
+                if isinstance(v, dict) and k not in hidden:
+                    if v:
+                        index.setdefault(k, v)
+                    else:
+                        empty.add(k)
+            if empty:
+                hidden = hidden | empty
+            fname = node.get('name') or node.get('apiName') or node.get('field') or node.get('fullName')
+            if isinstance(fname, str) and fname not in hidden:
+                index.setdefault(fname, node)
+            children = node.values()
+        elif isinstance(node, list):
+            children = node
+        else:
+            continue
+        stack.extend((c, hidden) for c in reversed(list(children)) if isinstance(c, (dict, list)))
+    return index
+
+
+@lru_cache(maxsize=64)
+def _field_index_cached(path_str: str, mtime_ns: int, size: int) -> Optional[Dict[str, Dict[str, Any]]]:
+    data = _load_json(Path(path_str))
+    return _index_fields(data) if data else None
+
+
+def _field_index(path: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Field-name index of the metadata file at `path`, built once per (path,
+    mtime, size); the dicts are shared between calls, so treat them as read-only."""
+    try:
+        st = path.stat()
+    except OSError:
         return None
-    if isinstance(data, dict):
-        if field_name in data and isinstance(data[field_name], dict):
-            return data[field_name]
-        fname = data.get('name') or data.get('apiName') or data.get('field') or data.get('fullName')
-        if fname == field_name:
-            return data
-        for v in data.values():
-            res = _search_field_in_data(v, field_name)
-            if res:
-                return res
-    elif isinstance(data, list):
-        for item in data:
-            res = _search_field_in_data(item, field_name)
-            if res:
-                return res
-    return None
+    return _field_index_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
 
+def _meta_indexes(obj_name: str, simplified_dir: Path, baseline_dir: Path) -> List[Dict[str, Dict[str, Any]]]:
+    """Field indexes of the simplified, baseline and incoming metadata of
+    `obj_name`, in lookup order; missing or empty files are left out."""
+    paths = (
+        simplified_dir / f'simplified-{obj_name}.json',
+        baseline_dir / f'baseline-{obj_name}.json',
+        Path('incoming_objects') / f'incoming-{obj_name}.json',
+    )
+    return [index for index in map(_field_index, paths) if index]
 
-def find_field_meta(obj_name: str, field_entry: Any, simplified_dir: Path, baseline_dir: Path) -> Optional[Dict[str, Any]]:
+
+def find_field_meta(obj_name: str, field_entry: Any, simplified_dir: Path, baseline_dir: Path,
+                    indexes: Optional[List[Dict[str, Dict[str, Any]]]] = None) -> Optional[Dict[str, Any]]:
+    """Metadata dict of a field of `obj_name`. Pass `indexes` from _meta_indexes()
+    to skip re-checking the object's files on every lookup."""
     # if already metadata dict
     if isinstance(field_entry, dict) and field_entry.get('name'):
         return field_entry
     field_name = str(field_entry)
-    simplified_file = simplified_dir / f'simplified-{obj_name}.json'
-    baseline_file = baseline_dir / f'baseline-{obj_name}.json'
-    incoming_file = Path('incoming_objects') / f'incoming-{obj_name}.json'
-    for p in (simplified_file, baseline_file, incoming_file):
-        data = _load_json(p) if p.exists() else None
-        if not data:
-            continue
-        found = _search_field_in_data(data, field_name)
+    if indexes is None:
+        indexes = _meta_indexes(obj_name, simplified_dir, baseline_dir)
+    for index in indexes:
+        found = index.get(field_name)
         if found:
             return found
     return None
 
 
-def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> List[Dict[str, Any]]:
+def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> List[Row]:
     data = _load_json(path)
     if not data:
         return []
@@ -87,11 +158,26 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
     removed = data.get('removed_fields', []) or []
     modified = data.get('modified_fields', {}) or {}
 
-    rows: List[Dict[str, Any]] = []
+    rows: List[Row] = []
+    indexes = None
+    field_meta: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def _meta(field_entry: Any) -> Optional[Dict[str, Any]]:
+        # the object's metadata files are stat'ed and indexed once per report, on
+        # first use, and each field name is looked up once
+        nonlocal indexes
+        if isinstance(field_entry, dict) and field_entry.get('name'):
+            return field_entry
+        key = str(field_entry)
+        if key not in field_meta:
+            if indexes is None:
+                indexes = _meta_indexes(obj, simplified_dir, baseline_dir)
+            field_meta[key] = find_field_meta(obj, key, simplified_dir, baseline_dir, indexes)
+        return field_meta[key]
 
     def _details(obj: Any) -> str:
         try:
-            return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+            return _compact_json(obj)
         except Exception:
             return str(obj)
 
@@ -103,6 +189,72 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
             return f"value={val},label={lab},active={act}"
         return str(it)
 
+    def _pick_options(items: Any) -> Tuple[Tuple[Any, Any, Any], ...]:
+        """(label, value, active) of each picklist option dict or plain value/label token.
+
+        Values come out as the per-option CSV rows have always shown them: text,
+        stripped, a missing label or value as 'None', and `active` as a bool when
+        it reads as one (otherwise its text).
+        """
+        options = []
+        for it in items:
+            if isinstance(it, dict):
+                val = str(it.get('value') if it.get('value') is not None else it.get('label')).strip()
+                lab = str(it.get('label')).strip()
+                act = str(it.get('active')).strip()
+                if act.lower() in ('true', '1', 'yes'):
+                    act = True
+                elif act.lower() in ('false', '0', 'no'):
+                    act = False
+                options.append((lab or val, val or lab, act))
+            elif str(it):
+                options.append((str(it), str(it), None))
+        return tuple(options)
+
+    def _pick_finder(meta: Any):
+        """Return a lookup `x -> picklist entry` for the field metadata `meta`.
+
+        Matches the first entry whose value or label equals `x`, like a linear
+        scan would, but indexes the entries once per field instead of per option.
+        """
+        pvs = meta.get('picklistValues') if isinstance(meta, dict) else None
+        if not pvs:
+            return lambda x: None
+        index: Dict[Any, Any] = {}
+        for pv in pvs:
+            if not isinstance(pv, dict):
+                continue
+            for key in (pv.get('value'), pv.get('label')):
+                try:
+                    index.setdefault(key, pv)
+                except TypeError:
+                    pass
+
+        def find(x: Any):
+            try:
+                return index.get(x)
+            except TypeError:
+                for pv in pvs:
+                    if isinstance(pv, dict) and (pv.get('value') == x or pv.get('label') == x):
+                        return pv
+                return None
+        return find
+
+    def _pick_items(meta: Any, added_vals: List[Any], removed_vals: List[Any]) -> Tuple[List[Any], List[Any]]:
+        """The added/removed options of a picklist diff, with plain value/label
+        tokens replaced by their entry in the field metadata `meta` when one exists."""
+        find_pick = _pick_finder(meta)
+        out = []
+        for vals in (added_vals, removed_vals):
+            items = []
+            for x in vals:
+                if isinstance(x, dict):
+                    items.append(x)
+                else:
+                    items.append(find_pick(x) or x)
+            out.append(items)
+        return out[0], out[1]
+
     def _resolve_pick_value(opt: Any, obj_name: str, field_name: str) -> Optional[str]:
         """Return the picklist `value` for an option dict or label/value token.
         If opt is a dict and has 'value', return it. If it has only label, try to find
@@ -122,7 +274,7 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
             v = None
         # search metadata for matching picklist item by label or value
         try:
-            mf = find_field_meta(obj_name, field_name, simplified_dir, baseline_dir)
+            mf = _meta(field_name)
             if isinstance(mf, dict) and mf.get('picklistValues'):
                 for pv in mf.get('picklistValues'):
                     if not isinstance(pv, dict):
@@ -138,67 +290,67 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
 
     # Added fields
     for fld in added:
-        meta = find_field_meta(obj, fld, simplified_dir, baseline_dir)
+        meta = _meta(fld)
         api_name = meta.get('name') if isinstance(meta, dict) else (fld if isinstance(fld, str) else '')
         label = meta.get('label') if isinstance(meta, dict) else ''
         dtype = meta.get('type') if isinstance(meta, dict) else ''
         details = _details(meta) if meta else _details(fld)
-        picklist_added = ''
+        picklist_added = ()
         if isinstance(meta, dict) and meta.get('picklistValues'):
             try:
-                picklist_added = ';'.join([_fmt_pick_item(pv) for pv in meta.get('picklistValues')])
+                picklist_added = _pick_options(meta.get('picklistValues'))
             except Exception:
-                picklist_added = ''
-        rows.append({
-            'objeto': obj,
-            'change_type': 'added',
-            'api_name': api_name,
-            'label': label,
-            'type': dtype,
-            'attribute': '',
-            'old': '',
-            'new': '',
-            'detail': details,
-            'picklist_added': picklist_added,
-            'picklist_removed': '',
-            'fields_old': fields_old,
-            'fields_new': fields_new,
-            'added_count': added_count,
-            'removed_count': removed_count,
-            'modified_count': modified_count,
-        })
+                picklist_added = ()
+        rows.append(Row(
+            objeto=obj,
+            change_type='added',
+            api_name=api_name,
+            label=label,
+            type=dtype,
+            attribute='',
+            old='',
+            new='',
+            detail=details,
+            picklist_added=picklist_added,
+            picklist_removed=(),
+            fields_old=fields_old,
+            fields_new=fields_new,
+            added_count=added_count,
+            removed_count=removed_count,
+            modified_count=modified_count,
+        ))
 
     # Removed fields
     for fld in removed:
-        meta = find_field_meta(obj, fld, simplified_dir, baseline_dir)
+        meta = _meta(fld)
         api_name = meta.get('name') if isinstance(meta, dict) else (fld if isinstance(fld, str) else '')
         label = meta.get('label') if isinstance(meta, dict) else ''
         dtype = meta.get('type') if isinstance(meta, dict) else ''
         details = _details(meta) if meta else _details(fld)
-        picklist_removed = ''
+        picklist_removed = ()
         if isinstance(meta, dict) and meta.get('picklistValues'):
             try:
-                picklist_removed = ';'.join([_fmt_pick_item(pv) for pv in meta.get('picklistValues')])
+                picklist_removed = _pick_options(meta.get('picklistValues'))
             except Exception:
-                picklist_removed = ''
-        rows.append({
-            'objeto': obj,
-            'change_type': 'removed',
-            'api_name': api_name,
-            'label': label,
-            'type': dtype,
-            'attribute': '',
-            'old': '',
-            'new': '',
-            'detail': details,
-            'picklist_added': '',
-            'picklist_removed': picklist_removed,
-            'fields_old': fields_old,
-            'fields_new': fields_new,
-            'added_count': added_count,
-            'removed_count': removed_count,
-            'modified_count': modified_count,
-        })
+                picklist_removed = ()
+        rows.append(Row(
+            objeto=obj,
+            change_type='removed',
+            api_name=api_name,
+            label=label,
+            type=dtype,
+            attribute='',
+            old='',
+            new='',
+            detail=details,
+            picklist_added=(),
+            picklist_removed=picklist_removed,
+            fields_old=fields_old,
+            fields_new=fields_new,
+            added_count=added_count,
+            removed_count=removed_count,
+            modified_count=modified_count,
+        ))
 
     # Modified: per-diff rows
     if isinstance(modified, dict):
@@ -209,7 +361,7 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
     # handle dict-style modified
     for name, det in items:
         fld = name
-        meta = find_field_meta(obj, fld, simplified_dir, baseline_dir)
+        meta = _meta(fld)
         api_name = meta.get('name') if isinstance(meta, dict) else fld
         label = meta.get('label') if isinstance(meta, dict) else (det.get('new', {}).get('label') if isinstance(det, dict) else '')
         dtype = meta.get('type') if isinstance(meta, dict) else (det.get('new', {}).get('type') if isinstance(det, dict) else '')
@@ -217,39 +369,16 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
         if isinstance(diffs, list) and diffs:
             for d in diffs:
                 attr = d.get('attribute')
-                picklist_added_field = ''
-                picklist_removed_field = ''
+                picklist_added_field = ()
+                picklist_removed_field = ()
                 if 'detail' in d and isinstance(d['detail'], dict) and attr == 'picklistValues':
                     pd = d['detail']
                     added_vals = pd.get('added', []) or []
                     removed_vals = pd.get('removed', []) or []
                     changed_vals = pd.get('changed', []) or []
-                    picklist_added_list = []
-                    picklist_removed_list = []
-                    for x in added_vals:
-                        if isinstance(x, dict):
-                            picklist_added_list.append(_fmt_pick_item(x))
-                        else:
-                            mf = find_field_meta(obj, fld, simplified_dir, baseline_dir)
-                            found = None
-                            if isinstance(mf, dict) and mf.get('picklistValues'):
-                                for pv in mf.get('picklistValues'):
-                                    if pv.get('value') == x or pv.get('label') == x:
-                                        found = pv
-                                        break
-                            picklist_added_list.append(_fmt_pick_item(found) if found else str(x))
-                    for x in removed_vals:
-                        if isinstance(x, dict):
-                            picklist_removed_list.append(_fmt_pick_item(x))
-                        else:
-                            mf = find_field_meta(obj, fld, simplified_dir, baseline_dir)
-                            found = None
-                            if isinstance(mf, dict) and mf.get('picklistValues'):
-                                for pv in mf.get('picklistValues'):
-                                    if pv.get('value') == x or pv.get('label') == x:
-                                        found = pv
-                                        break
-                            picklist_removed_list.append(_fmt_pick_item(found) if found else str(x))
+                    added_items, removed_items = _pick_items(meta, added_vals, removed_vals)
+                    picklist_added_list = [_fmt_pick_item(it) for it in added_items]
+                    picklist_removed_list = [_fmt_pick_item(it) for it in removed_items]
                     # detect removed+added pairs that represent a value rename (same label)
                     paired_indices = set()
                     try:
@@ -286,28 +415,28 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
                                     if old_active is not None or new_active is not None:
                                         min_old['active'] = old_active
                                         min_new['active'] = new_active
-                                    nr = {
-                                        'objeto': obj,
-                                        'change_type': 'picklist_value_modified',
-                                        '_parent_change_type': 'modified',
-                                        'api_name': api_name,
-                                        'label': label,
-                                        'type': dtype,
-                                        'attribute': attr,
-                                        'old': json.dumps(min_old, ensure_ascii=False, separators=(',', ':')),
-                                        'new': json.dumps(min_new, ensure_ascii=False, separators=(',', ':')),
-                                        'detail': json.dumps({'changed': {'value': (old_val_field, new_val_field), 'active': (old_active, new_active)}}, ensure_ascii=False, separators=(',', ':')),
-                                        'picklist_added': '',
-                                        'picklist_removed': '',
-                                        'picklist_value_label': lab or '',
-                                        'picklist_value_api': (new_val_field or old_val_field or ''),
-                                        'picklist_value_active': (str(new_active) if new_active is not None else (str(old_active) if old_active is not None else '')),
-                                        'fields_old': fields_old,
-                                        'fields_new': fields_new,
-                                        'added_count': added_count,
-                                        'removed_count': removed_count,
-                                        'modified_count': modified_count,
-                                    }
+                                    nr = Row(
+                                        objeto=obj,
+                                        change_type='picklist_value_modified',
+                                        parent_change_type='modified',
+                                        api_name=api_name,
+                                        label=label,
+                                        type=dtype,
+                                        attribute=attr,
+                                        old=_compact_json(min_old),
+                                        new=_compact_json(min_new),
+                                        detail=_compact_json({'changed': {'value': (old_val_field, new_val_field), 'active': (old_active, new_active)}}),
+                                        picklist_added=(),
+                                        picklist_removed=(),
+                                        picklist_value_label=lab or '',
+                                        picklist_value_api=(new_val_field or old_val_field or ''),
+                                        picklist_value_active=(str(new_active) if new_active is not None else (str(old_active) if old_active is not None else '')),
+                                        fields_old=fields_old,
+                                        fields_new=fields_new,
+                                        added_count=added_count,
+                                        removed_count=removed_count,
+                                        modified_count=modified_count,
+                                    )
                                     rows.append(nr)
                                     paired_indices.add(i)
                                     paired_indices.add(j)
@@ -322,8 +451,8 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
                         added_vals = new_added
                         removed_vals = new_removed
 
-                    picklist_added_field = ';'.join(picklist_added_list) if picklist_added_list else ''
-                    picklist_removed_field = ';'.join(picklist_removed_list) if picklist_removed_list else ''
+                    picklist_added_field = _pick_options(added_items)
+                    picklist_removed_field = _pick_options(removed_items)
                     # prepare detail for changed items too
                     parts = []
                     if added_vals:
@@ -367,28 +496,28 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
                                 if old_active is not None or new_active is not None:
                                     min_old['active'] = old_active
                                     min_new['active'] = new_active
-                                nr = {
-                                    'objeto': obj,
-                                    'change_type': 'picklist_value_modified',
-                                    '_parent_change_type': 'modified',
-                                    'api_name': api_name,
-                                    'label': label,
-                                    'type': dtype,
-                                    'attribute': attr,
-                                    'old': json.dumps(min_old, ensure_ascii=False, separators=(',', ':')),
-                                    'new': json.dumps(min_new, ensure_ascii=False, separators=(',', ':')),
-                                    'detail': json.dumps({'changed': {'value': (old_val_field, new_val_field), 'active': (old_active, new_active)}}, ensure_ascii=False, separators=(',', ':')),
-                                    'picklist_added': '',
-                                    'picklist_removed': '',
-                                    'picklist_value_label': lab or '',
-                                    'picklist_value_api': (new_val_field or old_val_field or ''),
-                                    'picklist_value_active': (str(new_active) if new_active is not None else (str(old_active) if old_active is not None else '')),
-                                    'fields_old': fields_old,
-                                    'fields_new': fields_new,
-                                    'added_count': added_count,
-                                    'removed_count': removed_count,
-                                    'modified_count': modified_count,
-                                }
+                                nr = Row(
+                                    objeto=obj,
+                                    change_type='picklist_value_modified',
+                                    parent_change_type='modified',
+                                    api_name=api_name,
+                                    label=label,
+                                    type=dtype,
+                                    attribute=attr,
+                                    old=_compact_json(min_old),
+                                    new=_compact_json(min_new),
+                                    detail=_compact_json({'changed': {'value': (old_val_field, new_val_field), 'active': (old_active, new_active)}}),
+                                    picklist_added=(),
+                                    picklist_removed=(),
+                                    picklist_value_label=lab or '',
+                                    picklist_value_api=(new_val_field or old_val_field or ''),
+                                    picklist_value_active=(str(new_active) if new_active is not None else (str(old_active) if old_active is not None else '')),
+                                    fields_old=fields_old,
+                                    fields_new=fields_new,
+                                    added_count=added_count,
+                                    removed_count=removed_count,
+                                    modified_count=modified_count,
+                                )
                                 rows.append(nr)
                     detail = '; '.join(parts) if parts else _details(d.get('detail'))
                     old_val = ''
@@ -408,14 +537,14 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
                         old_list = det.get('old', {}).get('referenceTo') if isinstance(det, dict) else None
                         if old_list is None:
                             old_list = r
-                        old_val = json.dumps(old_list, ensure_ascii=False, separators=(',', ':')) if old_list is not None else ''
+                        old_val = _compact_json(old_list) if old_list is not None else ''
                     except Exception:
                         old_val = _details(r)
                     try:
                         new_list = det.get('new', {}).get('referenceTo') if isinstance(det, dict) else None
                         if new_list is None:
                             new_list = a
-                        new_val = json.dumps(new_list, ensure_ascii=False, separators=(',', ':')) if new_list is not None else ''
+                        new_val = _compact_json(new_list) if new_list is not None else ''
                     except Exception:
                         new_val = _details(a)
                 else:
@@ -424,24 +553,24 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
                     new_val = d.get('new', '')
                     detail = _details(d.get('detail')) if 'detail' in d else ''
 
-                rows.append({
-                    'objeto': obj,
-                    'change_type': 'modified',
-                    'api_name': api_name,
-                    'label': label,
-                    'type': dtype,
-                    'attribute': attr,
-                    'old': old_val,
-                    'new': new_val,
-                    'detail': detail,
-                            'picklist_added': picklist_added_field,
-                            'picklist_removed': picklist_removed_field,
-                    'fields_old': fields_old,
-                    'fields_new': fields_new,
-                    'added_count': added_count,
-                    'removed_count': removed_count,
-                    'modified_count': modified_count,
-                })
+                rows.append(Row(
+                    objeto=obj,
+                    change_type='modified',
+                    api_name=api_name,
+                    label=label,
+                    type=dtype,
+                    attribute=attr,
+                    old=old_val,
+                    new=new_val,
+                    detail=detail,
+                            picklist_added=picklist_added_field,
+                            picklist_removed=picklist_removed_field,
+                    fields_old=fields_old,
+                    fields_new=fields_new,
+                    added_count=added_count,
+                    removed_count=removed_count,
+                    modified_count=modified_count,
+                ))
 
     # handle list-style modified (rare case)
     if isinstance(modified, list):
@@ -452,7 +581,7 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
             else:
                 fld = str(item)
                 det = item
-            meta = find_field_meta(obj, fld, simplified_dir, baseline_dir)
+            meta = _meta(fld)
             api_name = meta.get('name') if isinstance(meta, dict) else fld
             label = meta.get('label') if isinstance(meta, dict) else ''
             dtype = meta.get('type') if isinstance(meta, dict) else ''
@@ -465,255 +594,190 @@ def summarize_report(path: Path, simplified_dir: Path, baseline_dir: Path) -> Li
                         pd = d['detail']
                         added_vals = pd.get('added', []) or []
                         removed_vals = pd.get('removed', []) or []
-                        picklist_added_list = []
-                        picklist_removed_list = []
-                        for x in added_vals:
-                            if isinstance(x, dict):
-                                picklist_added_list.append(_fmt_pick_item(x))
-                            else:
-                                mf = find_field_meta(obj, fld, simplified_dir, baseline_dir)
-                                found = None
-                                if isinstance(mf, dict) and mf.get('picklistValues'):
-                                    for pv in mf.get('picklistValues'):
-                                        if pv.get('value') == x or pv.get('label') == x:
-                                            found = pv
-                                            break
-                                picklist_added_list.append(_fmt_pick_item(found) if found else str(x))
-                        for x in removed_vals:
-                            if isinstance(x, dict):
-                                picklist_removed_list.append(_fmt_pick_item(x))
-                            else:
-                                mf = find_field_meta(obj, fld, simplified_dir, baseline_dir)
-                                found = None
-                                if isinstance(mf, dict) and mf.get('picklistValues'):
-                                    for pv in mf.get('picklistValues'):
-                                        if pv.get('value') == x or pv.get('label') == x:
-                                            found = pv
-                                            break
-                                picklist_removed_list.append(_fmt_pick_item(found) if found else str(x))
+                        added_items, removed_items = _pick_items(meta, added_vals, removed_vals)
+                        picklist_added_list = [_fmt_pick_item(it) for it in added_items]
+                        picklist_removed_list = [_fmt_pick_item(it) for it in removed_items]
                         detail = ''
                         if added_vals:
                             detail = 'added:' + ';'.join(picklist_added_list)
                         if removed_vals:
                             detail = (detail + '; ' if detail else '') + 'removed:' + ';'.join(picklist_removed_list)
-                        rows.append({
-                            'objeto': obj,
-                            'change_type': 'modified',
-                            'api_name': api_name,
-                            'label': label,
-                            'type': dtype,
-                            'attribute': attr,
-                            'old': '',
-                            'new': '',
-                            'detail': detail,
-                            'picklist_added': ';'.join(picklist_added_list) if picklist_added_list else '',
-                            'picklist_removed': ';'.join(picklist_removed_list) if picklist_removed_list else '',
-                            'fields_old': fields_old,
-                            'fields_new': fields_new,
-                            'added_count': added_count,
-                            'removed_count': removed_count,
-                            'modified_count': modified_count,
-                        })
+                        rows.append(Row(
+                            objeto=obj,
+                            change_type='modified',
+                            api_name=api_name,
+                            label=label,
+                            type=dtype,
+                            attribute=attr,
+                            old='',
+                            new='',
+                            detail=detail,
+                            picklist_added=_pick_options(added_items),
+                            picklist_removed=_pick_options(removed_items),
+                            fields_old=fields_old,
+                            fields_new=fields_new,
+                            added_count=added_count,
+                            removed_count=removed_count,
+                            modified_count=modified_count,
+                        ))
                     else:
                         old_val = d.get('old', '')
                         new_val = d.get('new', '')
-                        rows.append({
-                            'objeto': obj,
-                            'change_type': 'modified',
-                            'api_name': api_name,
-                            'label': label,
-                            'type': dtype,
-                            'attribute': d.get('attribute'),
-                            'old': old_val,
-                            'new': new_val,
-                            'detail': _details(d.get('detail')) if 'detail' in d else '',
-                            'picklist_added': '',
-                            'picklist_removed': '',
-                            'fields_old': fields_old,
-                            'fields_new': fields_new,
-                            'added_count': added_count,
-                            'removed_count': removed_count,
-                            'modified_count': modified_count,
-                        })
+                        rows.append(Row(
+                            objeto=obj,
+                            change_type='modified',
+                            api_name=api_name,
+                            label=label,
+                            type=dtype,
+                            attribute=d.get('attribute'),
+                            old=old_val,
+                            new=new_val,
+                            detail=_details(d.get('detail')) if 'detail' in d else '',
+                            picklist_added=(),
+                            picklist_removed=(),
+                            fields_old=fields_old,
+                            fields_new=fields_new,
+                            added_count=added_count,
+                            removed_count=removed_count,
+                            modified_count=modified_count,
+                        ))
 
     return rows
 
 
-def main() -> int:
-    p = argparse.ArgumentParser()
-    p.add_argument('--reports-dir', '-r', default='report_objects', help='Directory with report-*.json files')
-    p.add_argument('--simplified-dir', '-s', default='simplified_objects', help='Directory with simplified-<object>.json')
-    p.add_argument('--baseline-dir', '-b', default='baseline_objects', help='Directory with baseline-<object>.json')
-    p.add_argument('--out', '-o', default=os.path.join('report_objects', 'reports_summary.csv'), help='Output CSV file for additions/removals')
-    p.add_argument('--out-modified', '-m', default=os.path.join('report_objects', 'reports_modified.csv'), help='Output CSV file for modifications')
-    args = p.parse_args()
-
-    reports_dir = Path(args.reports_dir)
-    simplified_dir = Path(args.simplified_dir)
-    baseline_dir = Path(args.baseline_dir)
-    out_csv = Path(args.out)
+def _summarize_worker(task: Tuple[str, str, str]) -> Tuple[str, List[Row], Optional[str]]:
+    """Summarize one report for run(); returns (path, rows, error) instead of raising."""
+    path, simplified_dir, baseline_dir = task
+    try:
+        return path, summarize_report(Path(path), Path(simplified_dir), Path(baseline_dir)), None
+    except Exception as e:
+        return path, [], str(e)
+
+
+def run(reports_dir: Path, simplified_dir: Path, baseline_dir: Path, out_csv: Path, out_modified: Path,
+        workers: int = 1, exclude: Iterable = ()) -> int:
+    """Summarize every report-*.json in `reports_dir` into the two CSV files.
+
+    With `workers` > 1 the reports are summarized in that many processes; rows
+    are still written in report order. Reports whose path is in `exclude` are left out.
+    """
+    reports_dir = Path(reports_dir)
+    simplified_dir = Path(simplified_dir)
+    baseline_dir = Path(baseline_dir)
+    out_csv = Path(out_csv)
+    out_modified = Path(out_modified)
     out_csv.parent.mkdir(parents=True, exist_ok=True)
 
     files = sorted(reports_dir.glob('report-*.json'))
+    if exclude:
+        skip = {Path(p).resolve() for p in exclude}
+        files = [f for f in files if f.resolve() not in skip]
     if not files:
         print('No report-*.json files found in', reports_dir)
         return 0
 
-    rows: List[Dict[str, Any]] = []
-    for f in files:
-        try:
-            r = summarize_report(f, simplified_dir, baseline_dir)
-            rows.extend(r)
-        except Exception as e:
-            print('Skipping', f.name, 'due to error:', e)
-
     cols = ['objeto', 'change_type', 'api_name', 'label', 'type', 'attribute', 'old', 'new', 'detail', 'picklist_value_label', 'picklist_value_api', 'picklist_value_active']
 
-    # Expand rows: for any row that has picklist_added/picklist_removed with multiple items,
-    # also emit one row per picklist option with columns picklist_value_label, picklist_value_api, picklist_value_active.
-    final_rows: List[Dict[str, Any]] = []
-    def _parse_pick_item_str(s: str):
-        # s expected like "value=USD,label=U.S. Dollar,active=True" or a plain token
-        if not s:
-            return (None, None, None, None)
-        parts = s.split(',')
-        kv = {}
-        for p in parts:
-            if '=' in p:
-                k, v = p.split('=', 1)
-                kv[k.strip()] = v.strip()
-        if kv:
-            label = kv.get('label') or kv.get('value')
-            value = kv.get('value') or kv.get('label')
-            active_raw = kv.get('active')
-            # try to convert active to boolean if possible
-            if isinstance(active_raw, str):
-                if active_raw.lower() in ('true', '1', 'yes'):
-                    active = True
-                elif active_raw.lower() in ('false', '0', 'no'):
-                    active = False
-                else:
-                    active = active_raw
-            else:
-                active = active_raw
-            obj = {'active': active, 'label': label, 'value': value}
-            return (label, value, active, obj)
-        # fallback: treat s as value and label
-        obj = {'active': None, 'label': s, 'value': s}
-        return (s, s, None, obj)
-
-    for r in rows:
-        # keep original row
-        final_rows.append(r.copy())
-        # handle added picklist entries -> emit one row per option
-        pa = r.get('picklist_added') or ''
-        if pa:
-            items = [it for it in pa.split(';') if it]
-            for it in items:
-                lbl, api, act, obj = _parse_pick_item_str(it)
-                nr = r.copy()
-                nr['_parent_change_type'] = r.get('change_type')
-                nr['change_type'] = 'picklist_value_added'
-                nr['picklist_value_label'] = lbl or ''
-                nr['picklist_value_api'] = api or ''
-                nr['picklist_value_active'] = act if act is not None else ''
-                try:
-                    nr['detail'] = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
-                except Exception:
-                    nr['detail'] = r.get('detail', '')
-                final_rows.append(nr)
-        # handle removed picklist entries -> emit one row per option
-        pr = r.get('picklist_removed') or ''
-        if pr:
-            items = [it for it in pr.split(';') if it]
-            for it in items:
-                lbl, api, act, obj = _parse_pick_item_str(it)
-                nr = r.copy()
-                nr['_parent_change_type'] = r.get('change_type')
-                nr['change_type'] = 'picklist_value_removed'
-                nr['picklist_value_label'] = lbl or ''
-                nr['picklist_value_api'] = api or ''
-                nr['picklist_value_active'] = act if act is not None else ''
+    def _summaries():
+        tasks = [(str(f), str(simplified_dir), str(baseline_dir)) for f in files]
+        if workers > 1 and len(tasks) > 1:
+            n = min(workers, len(tasks))
+            with ProcessPoolExecutor(max_workers=n) as pool:
+                yield from pool.map(_summarize_worker, tasks, chunksize=max(1, len(tasks) // (n * 4)))
+        else:
+            for task in tasks:
+                yield _summarize_worker(task)
+
+    def _expand(r: Row):
+        """Yield `r`, then one row per option in its picklist_added/picklist_removed.
+
+        Per-option rows carry the columns picklist_value_label, picklist_value_api
+        and picklist_value_active. Rows of type 'picklist_value_modified' are
+        already per-option and pass through unchanged.
+        """
+        yield r
+        for options, change_type in ((r.picklist_added, 'picklist_value_added'), (r.picklist_removed, 'picklist_value_removed')):
+            for lbl, api, act in options:
                 try:
-                    nr['detail'] = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+                    detail = _compact_json({'active': act, 'label': lbl, 'value': api})
                 except Exception:
-                    nr['detail'] = r.get('detail', '')
-                final_rows.append(nr)
-        # NOTE: do not re-append rows of type 'picklist_value_modified' here — they are already
-        # present in `rows` and were added to final_rows by the initial append above. Avoid duplication.
-
-    # split final_rows into two CSVs:
-    #  - additions/removals (and their per-option rows)
-    #  - modifications (and per-option rows that came from modified parents)
-    out_modified = Path(args.out_modified)
+                    detail = r.detail
+                yield r._replace(
+                    parent_change_type=r.change_type,
+                    change_type=change_type,
+                    picklist_value_label=lbl or '',
+                    picklist_value_api=api or '',
+                    picklist_value_active=act if act is not None else '',
+                    detail=detail,
+                )
+
+    def _route(r: Row) -> Optional[str]:
+        # split rows into two CSVs:
+        #  - additions/removals (and their per-option rows)
+        #  - modifications (and per-option rows that came from modified parents)
+        ct = r.change_type
+        parent = r.parent_change_type
+        if ct in ('added', 'removed'):
+            return 'addrem'
+        if ct in ('picklist_value_added', 'picklist_value_removed'):
+            # route per-option rows based on their parent change type;
+            # if no parent info, conservatively place in additions/removals
+            return 'modified' if parent == 'modified' else 'addrem'
+        if ct == 'picklist_value_modified':
+            # per-option modified rows go to modified CSV when parent is modified
+            return 'modified' if parent == 'modified' or parent is None else 'addrem'
+        if ct == 'modified':
+            return 'modified'
+        return None
+
     addrem_cols = ['objeto', 'change_type', 'api_name', 'label', 'type', 'detail', 'picklist_value_label', 'picklist_value_api', 'picklist_value_active']
     modified_cols = ['objeto', 'tipo de cambio', 'api_name', 'attribute', 'old', 'new', 'diff', 'picklist_value_label', 'picklist_value_api', 'picklist_value_active']
+    # Row fields behind each CSV column, in column order
+    addrem_values = operator.attrgetter('objeto', 'change_type', 'api_name', 'label', 'type', 'detail', 'picklist_value_label', 'picklist_value_api', 'picklist_value_active')
+    modified_values = operator.attrgetter('objeto', 'change_type', 'api_name', 'attribute', 'old', 'new', 'detail', 'picklist_value_label', 'picklist_value_api', 'picklist_value_active')
 
-    addrem_rows = []
-    modified_rows = []
-    for r in final_rows:
-        ct = r.get('change_type')
-        parent = r.get('_parent_change_type')
-        if ct in ('added', 'removed'):
-            addrem_rows.append(r)
-        elif ct in ('picklist_value_added', 'picklist_value_removed'):
-            # route per-option rows based on their parent change type
-            if parent in ('added', 'removed'):
-                addrem_rows.append(r)
-            elif parent == 'modified':
-                modified_rows.append(r)
-            else:
-                # if no parent info, conservatively place in additions/removals
-                addrem_rows.append(r)
-        elif ct == 'picklist_value_modified':
-            # per-option modified rows should go to modified CSV when parent is modified
-            if parent == 'modified' or parent is None:
-                modified_rows.append(r)
-            else:
-                addrem_rows.append(r)
-        elif ct == 'modified':
-            modified_rows.append(r)
-
-    # write additions/removals CSV
-    with out_csv.open('w', encoding='utf-8', newline='') as outf:
-        writer = csv.DictWriter(outf, fieldnames=addrem_cols)
-        writer.writeheader()
-        for r in addrem_rows:
-            outrow = {k: '' for k in addrem_cols}
-            outrow['objeto'] = r.get('objeto', '')
-            outrow['change_type'] = r.get('change_type', '')
-            outrow['api_name'] = r.get('api_name', '')
-            outrow['label'] = r.get('label', '')
-            outrow['type'] = r.get('type', '')
-            outrow['detail'] = r.get('detail', '')
-            outrow['picklist_value_label'] = r.get('picklist_value_label', '')
-            outrow['picklist_value_api'] = r.get('picklist_value_api', '')
-            outrow['picklist_value_active'] = r.get('picklist_value_active', '')
-            writer.writerow(outrow)
-
-    # write modifications CSV
+    # rows are written as they are produced; only one report's rows are held at a time
+    addrem_count = 0
+    modified_count = 0
     out_modified.parent.mkdir(parents=True, exist_ok=True)
-    with out_modified.open('w', encoding='utf-8', newline='') as outf2:
-        writer2 = csv.DictWriter(outf2, fieldnames=modified_cols)
-        writer2.writeheader()
-        for r in modified_rows:
-            outrow = {k: '' for k in modified_cols}
-            outrow['objeto'] = r.get('objeto', '')
-            outrow['tipo de cambio'] = r.get('change_type', '')
-            outrow['api_name'] = r.get('api_name', '')
-            outrow['attribute'] = r.get('attribute', '')
-            outrow['old'] = r.get('old', '')
-            outrow['new'] = r.get('new', '')
-            outrow['picklist_value_label'] = r.get('picklist_value_label', '')
-            outrow['picklist_value_api'] = r.get('picklist_value_api', '')
-            outrow['picklist_value_active'] = r.get('picklist_value_active', '')
-            outrow['diff'] = r.get('detail', '')
-            writer2.writerow(outrow)
-
-    print('Wrote', len(addrem_rows), 'rows to', out_csv)
-    print('Wrote', len(modified_rows), 'rows to', out_modified)
+    with out_csv.open('w', encoding='utf-8', newline='') as outf, \
+            out_modified.open('w', encoding='utf-8', newline='') as outf2:
+        writer = csv.writer(outf)
+        writer.writerow(addrem_cols)
+        writer2 = csv.writer(outf2)
+        writer2.writerow(modified_cols)
+        for path, rows, error in _summaries():
+            if error is not None:
+                print('Skipping', Path(path).name, 'due to error:', error)
+                continue
+            for row in rows:
+                for r in _expand(row):
+                    dest = _route(r)
+                    if dest == 'addrem':
+                        writer.writerow(addrem_values(r))
+                        addrem_count += 1
+                    elif dest == 'modified':
+                        writer2.writerow(modified_values(r))
+                        modified_count += 1
+
+    print('Wrote', addrem_count, 'rows to', out_csv)
+    print('Wrote', modified_count, 'rows to', out_modified)
     return 0
 
 
+def main() -> int:
+    p = argparse.ArgumentParser()
+    p.add_argument('--reports-dir', '-r', default='report_objects', help='Directory with report-*.json files')
+    p.add_argument('--simplified-dir', '-s', default='simplified_objects', help='Directory with simplified-<object>.json')
+    p.add_argument('--baseline-dir', '-b', default='baseline_objects', help='Directory with baseline-<object>.json')
+    p.add_argument('--out', '-o', default=os.path.join('report_objects', 'reports_summary.csv'), help='Output CSV file for additions/removals')
+    p.add_argument('--out-modified', '-m', default=os.path.join('report_objects', 'reports_modified.csv'), help='Output CSV file for modifications')
+    p.add_argument('--workers', type=int, default=0, help='Processes used to summarize reports (default: CPUs; 1 disables the pool)')
+    args = p.parse_args()
+
+    return run(args.reports_dir, args.simplified_dir, args.baseline_dir, args.out, args.out_modified,
+               workers=args.workers or os.cpu_count() or 1)
+
+
 if __name__ == '__main__':
     raise SystemExit(main())
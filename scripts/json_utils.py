@@ -0,0 +1,76 @@
+"""JSON load/dump helpers shared by the pipeline scripts.
+
+Uses orjson when it is installed (much faster on multi-MB describes) and falls
+back to the standard library otherwise, so a plain Python install keeps working.
+Default output matches `json.dump(obj, fh, ensure_ascii=False, indent=2)`.
+"""
+
+import collections
+import gzip
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# path -> (mtime_ns, size, obj) for the last few files written by dump(), so
+# load() can hand back a file this process just wrote (e.g. the cleaned temp
+# file that the diff reads next) without parsing it again.
+_WRITTEN = collections.OrderedDict()
+_WRITTEN_MAX = 4
+
+
+def loads(data):
+    """Parse JSON from `bytes` or `str`."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, compact=False):
+    """Serialize `obj` to UTF-8 encoded JSON bytes.
+
+    2-space indented by default; `compact=True` drops all whitespace, for
+    machine-only files nobody reads or diffs.
+    """
+    if orjson is not None:
+        # OPT_NON_STR_KEYS: stringify None/int/bool keys (e.g. picklist maps keyed by
+        # a missing value) the way the json module does instead of raising
+        option = orjson.OPT_NON_STR_KEYS if compact else orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def load(path):
+    """Parse the JSON file at `path`.
+
+    If the file is still exactly as a recent dump() left it (same mtime and
+    size) the dumped object itself is returned; treat the result as read-only.
+    Paths ending in `.gz` are decompressed first.
+    """
+    hit = _WRITTEN.get(path)
+    if hit is not None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is not None and (st.st_mtime_ns, st.st_size) == hit[:2]:
+            return hit[2]
+        del _WRITTEN[path]
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as fh:
+        return loads(fh.read())
+
+
+def dump(obj, path, compact=False):
+    with open(path, 'wb') as fh:
+        fh.write(dumps(obj, compact=compact))
+    st = os.stat(path)
+    _WRITTEN.pop(path, None)
+    _WRITTEN[path] = (st.st_mtime_ns, st.st_size, obj)
+    while len(_WRITTEN) > _WRITTEN_MAX:
+        _WRITTEN.popitem(last=False)
@@ -1,13 +1,17 @@
 import os
-import json
+import sys
 import argparse
 import subprocess
 import time
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
-ROOT_DIR = os.path.dirname(THIS_DIR)
+# scripts/tools/ -> repo root
+ROOT_DIR = os.path.dirname(os.path.dirname(THIS_DIR))
 INCOMING_DIR = os.path.join(ROOT_DIR, 'incoming_objects')
 SCRIPTS_DIR = os.path.join(ROOT_DIR, 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+import json_utils
+from download_campos import sf_command
 
 # Try to import the canonical objects list from the download script so we can
 # resolve friendly names in the map (like "Party_Relationship") to real
@@ -54,14 +58,14 @@ def read_json_flexible(path):
     for enc in candidates:
         try:
             text = data.decode(enc)
-            return json.loads(text)
+            return json_utils.loads(text)
         except Exception:
             continue
     return None
 
 
 def describe_object(api, out_path, target_org=None, timeout=120, retries=2, dry_run=False):
-    cmd = ['sf', 'force:schema:sobject:describe', '--sobjecttype', api, '--json']
+    cmd = [*sf_command(), 'force:schema:sobject:describe', '--sobjecttype', api, '--json']
     if target_org:
         cmd += ['--target-org', target_org]
 
@@ -80,18 +84,8 @@ def describe_object(api, out_path, target_org=None, timeout=120, retries=2, dry_
                 err = proc.stderr.decode(errors='ignore') if proc.stderr else ''
                 print(f'Attempt {attempt} failed for {api}: rc={proc.returncode} err={err}')
         except FileNotFoundError:
-            target_part = f' --target-org {target_org}' if target_org else ''
-            cmd_line = f'sf force:schema:sobject:describe --sobjecttype "{api}" --json{target_part}'
-            try:
-                with open(out_path, 'wb') as f:
-                    proc = subprocess.run(cmd_line, stdout=f, stderr=subprocess.PIPE, timeout=timeout, shell=True)
-                if proc.returncode == 0:
-                    return 0
-                else:
-                    err = proc.stderr.decode(errors='ignore') if proc.stderr else ''
-                    print(f'Attempt {attempt} failed for {api} (shell): rc={proc.returncode} err={err}')
-            except subprocess.TimeoutExpired:
-                print(f'Attempt {attempt} timed out after {timeout}s for {api} (shell)')
+            print(f'sf CLI not found on PATH; cannot download {api}')
+            return 1
         except subprocess.TimeoutExpired:
             print(f'Attempt {attempt} timed out after {timeout}s for {api}')
         time.sleep(1 + attempt)
@@ -100,8 +94,7 @@ def describe_object(api, out_path, target_org=None, timeout=120, retries=2, dry_
 
 def load_map(map_path):
     try:
-        with open(map_path, 'r', encoding='utf-8') as fh:
-            return json.load(fh)
+        return json_utils.load(map_path)
     except Exception:
         return None
 
@@ -1,20 +1,29 @@
 import os
-import subprocess
 import sys
 
-ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# scripts/tools/ -> repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 SCRIPTS_DIR = os.path.join(ROOT, 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+import clean_campos
 IN_DIR = os.path.join(ROOT, 'incoming_objects')
 OUT_DIR = os.path.join(ROOT, 'simplified_objects')
 
 def ensure_out():
-    if not os.path.exists(OUT_DIR):
-        os.makedirs(OUT_DIR)
+    os.makedirs(OUT_DIR, exist_ok=True)
 
 def run_clean(in_path, out_path):
-    cmd = [sys.executable, os.path.join(SCRIPTS_DIR, 'clean_campos.py'), in_path, out_path]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    return proc.returncode, proc.stdout.decode(errors='replace')
+    # In-process call; its output goes straight to stdout as it is produced.
+    try:
+        clean_campos.run(in_path, out_path)
+    except FileNotFoundError as e:
+        print(f'Error: {e}')
+        return 2
+    except Exception as e:
+        print('clean_campos.py failed:')
+        print(e)
+        return 2
+    return 0
 
 def main():
     ensure_out()
@@ -29,8 +38,7 @@ def main():
         out_name = f'simplified-{name}.json'
         out_path = os.path.join(OUT_DIR, out_name)
         print('--- Processing', fname)
-        rc, out = run_clean(in_path, out_path)
-        print(out)
+        rc = run_clean(in_path, out_path)
         if rc == 0:
             print(f'[OK] Wrote {out_path}')
         else:
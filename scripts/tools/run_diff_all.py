@@ -1,10 +1,13 @@
 import os
 import sys
-import json
-import subprocess
+import traceback
 
-ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# scripts/tools/ -> repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 SCRIPTS_DIR = os.path.join(ROOT, 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+import diff_campos
+import json_utils
 MAP_PATH = os.path.join(ROOT, 'objects_map.json')
 SIMPLIFIED_DIR = os.path.join(ROOT, 'simplified_objects')
 BASELINE_DIR = os.path.join(ROOT, 'baseline_objects')
@@ -12,19 +15,21 @@ REPORT_DIR = os.path.join(ROOT, 'report_objects')
 
 def ensure_dirs():
     for d in (SIMPLIFIED_DIR, BASELINE_DIR, REPORT_DIR):
-        if not os.path.exists(d):
-            os.makedirs(d)
+        os.makedirs(d, exist_ok=True)
 
 def run_diff(old_path, new_path, report_path):
-    cmd = [sys.executable, os.path.join(SCRIPTS_DIR, 'diff_campos.py'), old_path, new_path, report_path]
-    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    return proc.returncode, proc.stdout.decode(errors='replace')
+    # In-process call; its output goes straight to stdout as it is produced.
+    try:
+        diff_campos.run(old_path, new_path, report_path)
+    except Exception:
+        traceback.print_exc(file=sys.stdout)
+        return 1
+    return 0
 
 def main():
     ensure_dirs()
     try:
-        with open(MAP_PATH, 'r', encoding='utf-8') as fh:
-            data = json.load(fh)
+        data = json_utils.load(MAP_PATH)
     except Exception as e:
         print('Failed to load map:', MAP_PATH, e)
         return 2
@@ -50,11 +55,10 @@ def main():
         if not os.path.isfile(base_path):
             print('[WARN] baseline missing, using empty baseline:', base_path)
             # create an empty baseline file
-            with open(base_path, 'w', encoding='utf-8') as fh:
-                json.dump({'fields': []}, fh)
+            with open(base_path, 'wb') as fh:
+                fh.write(b'{"fields":[]}')
 
-        rc, out = run_diff(base_path, simp_path, report_path)
-        print(out)
+        rc = run_diff(base_path, simp_path, report_path)
         if rc == 0:
             print('[OK] report ->', report_path)
         else: